@@ -0,0 +1,59 @@
+import os
+import re
+import base64
+import hashlib
+import tempfile
+from typing import Optional
+
+# ==============================================================
+# Content-Addressed Logo Store
+# ==============================================================
+
+LOGO_STORE_DIR = os.getenv("LOGO_STORE_DIR", "./assets/logos")
+LOGO_URL_PREFIX = "/assets/logos/"
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+def _path_for(digest: str) -> str:
+    # Fan out into 256 subdirectories so no single directory grows huge
+    return os.path.join(LOGO_STORE_DIR, digest[:2], f"{digest}.png")
+
+def save_logo(data: bytes) -> str:
+    """Store PNG bytes once under their SHA-256 and return the digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = _path_for(digest)
+    if os.path.exists(path):
+        return digest
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return digest
+
+def logo_url(digest: str) -> str:
+    return f"{LOGO_URL_PREFIX}{digest}"
+
+def logo_path(digest: str) -> Optional[str]:
+    """Filesystem path for a digest, or None if it is malformed or missing."""
+    if not _DIGEST_RE.match(digest):
+        return None
+    path = _path_for(digest)
+    return path if os.path.exists(path) else None
+
+def data_url_to_logo_url(url: Optional[str]) -> Optional[str]:
+    """Move an inline data:image/...;base64 logo into the store. Other values pass through."""
+    if not url or not url.startswith("data:image/"):
+        return url
+    try:
+        _, encoded = url.split(",", 1)
+        return logo_url(save_logo(base64.b64decode(encoded)))
+    except Exception as e:
+        print("[ASSETS] Could not migrate inline logo:", e)
+        return url
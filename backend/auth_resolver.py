@@ -0,0 +1,114 @@
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from sqlalchemy import select
+
+from database import AsyncSessionLocal
+from models import User
+from auth_utils import SECRET_KEY, ALGORITHM
+
+# ==============================================================
+# Config
+# ==============================================================
+
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user, detached from any DB session."""
+    id: int
+    email: str
+    full_name: Optional[str] = None
+
+# ==============================================================
+# Verified Token Cache
+# ==============================================================
+
+class PrincipalCache:
+    """LRU of token -> Principal. Entries never outlive the token's exp claim."""
+
+    def __init__(self, max_entries: int = AUTH_CACHE_MAX_ENTRIES, ttl_seconds: int = AUTH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, token: str, now: float) -> Optional[Principal]:
+        entry = self._entries.get(token)
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                del self._entries[token]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(token)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def set(self, token: str, principal: Principal, token_exp: float, now: float) -> None:
+        self._entries[token] = (min(token_exp, now + self.ttl_seconds), principal)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**self.stats, "entries": len(self._entries)}
+
+principal_cache = PrincipalCache()
+
+async def resolve_token(token: str) -> Optional[Principal]:
+    """Principal for a bearer token, or None if it is invalid, expired or the user is gone."""
+    now = time.time()
+    principal = principal_cache.get(token, now)
+    if principal is not None:
+        return principal
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    email = payload.get("sub")
+    exp = payload.get("exp")
+    if email is None or exp is None:
+        return None
+
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(User.id, User.email, User.full_name).where(User.email == email)
+        )).first()
+    if row is None:
+        return None
+
+    principal = Principal(id=row.id, email=row.email, full_name=row.full_name)
+    principal_cache.set(token, principal, float(exp), now)
+    return principal
+
+# ==============================================================
+# FastAPI Dependencies
+# ==============================================================
+
+async def get_optional_user(authorization: Optional[str] = Header(None)) -> Optional[Principal]:
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return await resolve_token(token.strip())
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    principal = await resolve_token(token)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from response_cache import get_cached_venture_response
+
+# ==============================================================
+# Config
+# ==============================================================
+
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+BATCH_MAX_IDEAS = int(os.getenv("BATCH_MAX_IDEAS", "500"))
+
+# ==============================================================
+# Batch Runner
+# ==============================================================
+
+async def run_batch(
+    ideas: List[str],
+    concurrency: Optional[int] = None,
+    bypass_cache: bool = False,
+    mode: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs every idea through the cached pipeline with at most `concurrency`
+    in flight and yields one record per idea in completion order. Upstream
+    RPM/TPM limits are enforced by rate_limits inside venture_chain.
+    """
+    concurrency = max(1, min(concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    sem = asyncio.Semaphore(concurrency)
+
+    async def run_one(index: int, idea: str) -> Dict[str, Any]:
+        async with sem:
+            try:
+                result = await get_cached_venture_response(idea, bypass_cache=bypass_cache, mode=mode)
+                return {"index": index, "idea": idea, "ok": True, "result": result}
+            except Exception as e:
+                return {"index": index, "idea": idea, "ok": False, "error": str(e)}
+
+    tasks = [asyncio.create_task(run_one(i, idea)) for i, idea in enumerate(ideas)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# ==============================================================
+# CLI: python batch.py ideas.txt > packs.ndjson
+# ==============================================================
+
+async def _main(args: argparse.Namespace) -> None:
+    from clients import clients
+
+    with open(args.file, encoding="utf-8") as f:
+        ideas = [line.strip() for line in f if line.strip()]
+
+    ok = 0
+    try:
+        async for record in run_batch(ideas, args.concurrency, args.bypass_cache, args.mode):
+            ok += record["ok"]
+            sys.stdout.write(json.dumps(record) + "\n")
+            sys.stdout.flush()
+    finally:
+        await clients.aclose()
+    print(f"[BATCH] {ok}/{len(ideas)} ideas succeeded.", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate startup packs for a file of ideas (one per line).")
+    parser.add_argument("file")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--bypass-cache", action="store_true")
+    parser.add_argument("--mode", choices=["fanout", "compact"], default=None)
+    asyncio.run(_main(parser.parse_args()))
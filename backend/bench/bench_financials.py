@@ -0,0 +1,49 @@
+"""
+Financial projection engine timings: one deterministic projection, Monte
+Carlo runs of increasing size and a factorial driver sweep.
+
+    python bench/bench_financials.py
+    python bench/bench_financials.py --months 60 --draws 1000,10000,20000
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from financials import FinancialDrivers, projection, monte_carlo, sweep
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--draws", type=ints, default=[1000, 5000, 10000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    drivers = FinancialDrivers(price=30, cac=120, churn=0.04, headcount=4, monthly_growth=0.06)
+    print(f"{'run':<28} {'median ms':>10}")
+    print(f"{'projection':<28} {timed(lambda: projection(drivers, args.months), args.repeat):>10.2f}")
+    for draws in args.draws:
+        ms = timed(lambda: monte_carlo(drivers, args.months, draws, seed=1), args.repeat)
+        print(f"{f'monte carlo x{draws}':<28} {ms:>10.2f}")
+    grid = {"price": [10, 20, 30, 40, 50], "cac": [50, 100, 150, 200], "churn": [0.02, 0.04, 0.06, 0.08, 0.1]}
+    ms = timed(lambda: sweep(drivers, grid, args.months), args.repeat)
+    print(f"{'sweep x100':<28} {ms:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Argon2 cost benchmark: single-hash latency and process-pool throughput for a
+grid of ARGON2_TIME_COST / ARGON2_MEMORY_COST values, to pick settings that
+keep login p95 and memory (workers x memory_cost) within budget.
+
+    python bench/bench_password_hash.py
+    python bench/bench_password_hash.py --time-costs 2,3 --memory-costs 19456,65536 --workers 4 --hashes 32
+"""
+import time
+import argparse
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from passlib.hash import argon2
+
+def hash_once(time_cost: int, memory_cost: int, parallelism: int) -> float:
+    start = time.perf_counter()
+    argon2.using(rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism).hash("bench-password")
+    return time.perf_counter() - start
+
+def ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--time-costs", type=ints, default=[1, 2, 3])
+    parser.add_argument("--memory-costs", type=ints, default=[19456, 47104, 65536])
+    parser.add_argument("--parallelism", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--hashes", type=int, default=16, help="Hashes per setting for the pool run")
+    args = parser.parse_args()
+
+    print(f"{'t':>3} {'m (KiB)':>9} {'p50 ms':>8} {'max ms':>8} {'pool/s':>8} {'pool RAM':>9}")
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for t in args.time_costs:
+            for m in args.memory_costs:
+                single = [hash_once(t, m, args.parallelism) for _ in range(5)]
+                start = time.perf_counter()
+                list(pool.map(hash_once, [t] * args.hashes, [m] * args.hashes, [args.parallelism] * args.hashes))
+                rate = args.hashes / (time.perf_counter() - start)
+                print(f"{t:>3} {m:>9} {statistics.median(single) * 1000:>8.1f} {max(single) * 1000:>8.1f} "
+                      f"{rate:>8.1f} {args.workers * m / 1024:>7.0f}MB")
+
+if __name__ == "__main__":
+    main()
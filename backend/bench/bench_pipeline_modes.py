@@ -0,0 +1,121 @@
+"""
+Compares the "fanout" pipeline (one LLM call per stage) with "compact" (one
+structured call for pack + scenario + competitors) against the fake upstreams:
+end-to-end latency, LLM calls, prompt/completion tokens and how complete the
+output is (scenario present, >= 3 competitor rows, logo present).
+
+    python bench/bench_pipeline_modes.py --ideas 20 --concurrency 4
+    python bench/bench_pipeline_modes.py --llm-latency lognormal:-1.0,0.4 --llm-ms-per-output-token 5
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Any, Dict, List
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+def wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def complete(result: Dict[str, Any]) -> bool:
+    pack = result.get("startup_pack") or {}
+    return bool(
+        pack.get("real_world_scenario")
+        and len(result.get("competitor_matrix") or []) >= 3
+        and (pack.get("brand") or {}).get("logo_url")
+    )
+
+async def run_mode(mode: str, ideas: List[str], concurrency: int) -> Dict[str, Any]:
+    from venture_chain import get_venture_response
+
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    results: List[Dict[str, Any]] = []
+
+    async def one(idea: str) -> None:
+        async with sem:
+            start = time.perf_counter()
+            result = await get_venture_response(idea, mode=mode)
+            latencies.append(time.perf_counter() - start)
+            results.append(result)
+
+    await asyncio.gather(*(one(idea) for idea in ideas))
+    return {"latencies": latencies, "complete": sum(complete(r) for r in results)}
+
+async def compare(args: argparse.Namespace, upstream_url: str) -> None:
+    # One event loop for every mode: the shared LLM/HTTP clients are bound to it
+    print(f"{'mode':<8} {'p50 s':>7} {'p95 s':>7} {'calls':>6} {'prompt tok':>11} "
+          f"{'compl tok':>10} {'complete':>9}")
+    for mode in args.modes.split(","):
+        ideas = [f"{mode} benchmark idea {i}: a marketplace for niche service #{i}" for i in range(args.ideas)]
+        before = httpx.get(f"{upstream_url}/stats").json()
+        stats = await run_mode(mode, ideas, args.concurrency)
+        after = httpx.get(f"{upstream_url}/stats").json()
+        delta = {k: after[k] - before[k] for k in after}
+        n = len(ideas)
+        print(f"{mode:<8} {statistics.median(stats['latencies']):>7.2f} "
+              f"{percentile(stats['latencies'], 0.95):>7.2f} {delta['chat'] / n:>6.1f} "
+              f"{delta['prompt_tokens'] / n:>11.0f} {delta['completion_tokens'] / n:>10.0f} "
+              f"{stats['complete']:>4}/{n:<4}")
+    print("(calls and tokens are per idea)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default="fanout,compact")
+    parser.add_argument("--ideas", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--llm-latency", default="lognormal:-1.0,0.4")
+    parser.add_argument("--llm-ms-per-output-token", type=float, default=2.0)
+    parser.add_argument("--image-latency", default="uniform:0.5,1.5")
+    parser.add_argument("--upstream-port", type=int, default=9100)
+    args = parser.parse_args()
+
+    upstream_url = f"http://127.0.0.1:{args.upstream_port}"
+    # Must be set before venture_chain/clients are imported
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-bench",
+        "STABILITY_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": f"{upstream_url}/v1",
+        "STABILITY_ENDPOINT": f"{upstream_url}/v2beta/stable-image/generate/core",
+        "DOMAIN_RESOLVER": "rdap",
+        "DOMAIN_RDAP_URL": f"{upstream_url}/rdap/domain/",
+        "LOGO_STORE_DIR": os.path.join(tempfile.mkdtemp(prefix="venturemind-bench-"), "logos"),
+        "LLM_HEDGE_ENABLED": "0",
+    })
+    sys.path.insert(0, BACKEND_DIR)
+
+    upstream = subprocess.Popen([
+        sys.executable, os.path.join(BENCH_DIR, "fake_upstreams.py"),
+        "--port", str(args.upstream_port),
+        "--llm-latency", args.llm_latency,
+        "--llm-ms-per-output-token", str(args.llm_ms_per_output_token),
+        "--image-latency", args.image_latency,
+    ])
+    try:
+        wait_ready(f"{upstream_url}/stats")
+        asyncio.run(compare(args, upstream_url))
+    finally:
+        upstream.terminate()
+        upstream.wait(timeout=10)
+
+if __name__ == "__main__":
+    main()
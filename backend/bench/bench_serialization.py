@@ -0,0 +1,94 @@
+"""
+Micro-benchmark for the /api/chat response path: the previous
+model_dump -> json.dumps (history) -> ChatResponse re-validation ->
+jsonable_encoder -> JSONResponse chain, against the single-serialization
+path (one dumps of the pack, bytes reused for history and the response).
+History compression is identical in both paths and left out.
+
+    python bench/bench_serialization.py
+    python bench/bench_serialization.py --logo-kb 300 --iterations 500
+
+--logo-kb inlines a base64 logo of that size, as packs stored before the
+asset store did.
+"""
+import os
+import sys
+import json
+import base64
+import timeit
+import argparse
+import tracemalloc
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from venture_chain import StartupPack
+from serialization import JSON_BACKEND, FastJSONResponse, dumps, splice_object
+from fake_upstreams import fake_instance
+
+class ChatResponse(BaseModel):
+    # Same shape as main.ChatResponse; importing main would create the app database
+    reply_markdown: str
+    startup_pack: Dict[str, Any]
+    domains: list = []
+    competitor_matrix: list = []
+
+def make_pack(logo_kb: int) -> StartupPack:
+    schema = StartupPack.model_json_schema()
+    pack = StartupPack.model_validate(fake_instance(schema, schema))
+    if logo_kb:
+        pack.brand.logo_url = "data:image/png;base64," + base64.b64encode(os.urandom(logo_kb * 768)).decode()
+    return pack
+
+def old_path(pack: StartupPack, reply_markdown: str) -> bytes:
+    startup_pack = pack.model_dump()
+    json.dumps(startup_pack).encode()  # history row
+    response = ChatResponse(reply_markdown=reply_markdown, startup_pack=startup_pack)
+    validated = ChatResponse.model_validate(response)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+def new_path(pack: StartupPack, reply_markdown: str) -> bytes:
+    startup_pack = pack.model_dump()
+    pack_json = dumps(startup_pack)  # also the history row's bytes
+    return FastJSONResponse(splice_object(
+        reply_markdown=dumps(reply_markdown),
+        startup_pack=pack_json,
+        domains=b"[]",
+        competitor_matrix=b"[]",
+    )).body
+
+def measure(fn: Callable[[], bytes], iterations: int) -> Dict[str, float]:
+    best = min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"us_per_call": round(best * 1e6, 1), "peak_alloc_kb": round(peak / 1024, 1)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logo-kb", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    pack = make_pack(args.logo_kb)
+    reply_markdown = "## Startup Summary\n" + pack.startup_summary * 10
+
+    old_body = old_path(pack, reply_markdown)
+    new_body = new_path(pack, reply_markdown)
+    assert json.loads(old_body) == json.loads(new_body), "paths disagree"
+
+    old = measure(lambda: old_path(pack, reply_markdown), args.iterations)
+    new = measure(lambda: new_path(pack, reply_markdown), args.iterations)
+    print(f"backend={JSON_BACKEND} body={len(new_body) / 1024:.1f} KB iterations={args.iterations}")
+    print(f"{'path':<8} {'us/call':>10} {'peak KB':>10}")
+    print(f"{'old':<8} {old['us_per_call']:>10} {old['peak_alloc_kb']:>10}")
+    print(f"{'new':<8} {new['us_per_call']:>10} {new['peak_alloc_kb']:>10}")
+    print(f"speedup  {old['us_per_call'] / new['us_per_call']:.2f}x")
+
+if __name__ == "__main__":
+    main()
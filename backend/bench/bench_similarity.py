@@ -0,0 +1,153 @@
+"""
+Similar-ideas index at scale: builds a synthetic startup_history in a
+throwaway SQLite database, times the offline rebuild, incremental indexing
+in history-writer sized batches and /api/ideas/similar lookups, and
+compares lookups with a full scan. Queries are stored ideas, once verbatim
+(a resubmission) and once perturbed (a near-duplicate); recall is how often
+that item comes back.
+
+    python bench/bench_similarity.py
+    python bench/bench_similarity.py --rows 100000 --users 100 --queries 200
+"""
+import os
+import sys
+import time
+import random
+import itertools
+import asyncio
+import argparse
+import tempfile
+import statistics
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def vocabulary(size: int, rng: random.Random) -> List[str]:
+    syllables = ["ka", "lo", "mi", "ren", "to", "sa", "vi", "no", "pe", "du", "ra", "shi", "mo", "te", "ga", "lu"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+def sentence(words: List[str], weights: List[float], n: int, rng: random.Random) -> str:
+    return " ".join(rng.choices(words, cum_weights=weights, k=n))
+
+def perturb(text: str, words: List[str], share: float, rng: random.Random) -> str:
+    return " ".join(rng.choice(words) if rng.random() < share else w for w in text.split())
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1, help="rows are spread over this many owners")
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--perturb", type=float, default=0.15, help="share of words replaced in each query")
+    parser.add_argument("--scans", type=int, default=2, help="full-scan baseline queries")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # database.py opens ./venturemind.db; run in a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix="venturemind-similar-"))
+    sys.path.insert(0, BACKEND_DIR)
+    from sqlalchemy import text, bindparam
+    import models
+    from database import engine, SessionLocal, AsyncSessionLocal, async_engine
+    from similarity import rebuild_index, bucket_rows, find_similar, shingles, jaccard, INSERT_BUCKETS
+
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(args.seed)
+    words = vocabulary(args.vocabulary, rng)
+    # Zipf-like word frequencies, as cumulative weights so each draw is a bisect
+    weights = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(words))))
+
+    def make_rows(count: int, first_id: int) -> List[Tuple[int, int, str, str]]:
+        return [
+            (first_id + i, rng.randrange(args.users) + 1,
+             sentence(words, weights, rng.randint(5, 10), rng), sentence(words, weights, rng.randint(25, 40), rng))
+            for i in range(count)
+        ]
+
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for first in range(0, args.rows, 50000):
+            conn.exec_driver_sql(
+                "INSERT INTO startup_history (id, user_id, idea, summary) VALUES (?, ?, ?, ?)",
+                make_rows(min(50000, args.rows - first), first + 1),
+            )
+    print(f"generated {args.rows} rows for {args.users} user(s) in {time.perf_counter() - start:.1f}s")
+    size_before = os.path.getsize("venturemind.db")
+
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        rebuild_index(db)
+        buckets = db.execute(text("SELECT count(*) FROM idea_lsh")).scalar()
+        db.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    build_s = time.perf_counter() - start
+    index_mb = (os.path.getsize("venturemind.db") - size_before) / 1e6
+    print(f"rebuild: {build_s:.1f}s ({args.rows / build_s:,.0f} rows/s), {buckets:,} buckets, ~{index_mb:.0f} MB")
+
+    # Incremental path: 20 history-writer batches of 50 new items each
+    batch_ms, index_ms = [], []
+    with SessionLocal() as db:
+        for b in range(20):
+            new = make_rows(50, args.rows + 1 + b * 50)
+            t = time.perf_counter()
+            db.execute(text("INSERT INTO startup_history (id, user_id, idea, summary) VALUES (:a, :b, :c, :d)"),
+                       [dict(zip("abcd", r)) for r in new])
+            t_index = time.perf_counter()
+            db.execute(INSERT_BUCKETS, bucket_rows((r[0], r[1], r[2]) for r in new))
+            index_ms.append((time.perf_counter() - t_index) * 1000)
+            db.commit()
+            batch_ms.append((time.perf_counter() - t) * 1000)
+    print(f"incremental: {statistics.median(batch_ms):.1f} ms per 50-item batch incl. commit, "
+          f"{statistics.median(index_ms):.1f} ms of it indexing (medians)")
+
+    with engine.connect() as conn:
+        sources = conn.execute(
+            text("SELECT id, user_id, idea FROM startup_history WHERE id IN :ids")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": rng.sample(range(1, args.rows + 1), args.queries)},
+        ).all()
+    exact = [(r.id, r.user_id, r.idea) for r in sources]
+    perturbed = [(r.id, r.user_id, perturb(r.idea, words, args.perturb, rng)) for r in sources]
+
+    async def lookups(queries: List[Tuple[int, int, str]]) -> Tuple[List[float], int, List[float]]:
+        latencies, found, similarities = [], 0, []
+        async with AsyncSessionLocal() as db:
+            await find_similar(db, queries[0][1], queries[0][2])  # warm-up
+            for source_id, user_id, q in queries:
+                t = time.perf_counter()
+                matches = await find_similar(db, user_id, q, limit=10)
+                latencies.append((time.perf_counter() - t) * 1000)
+                hit = next((score for row, score in matches if row.id == source_id), None)
+                if hit is not None:
+                    found += 1
+                    similarities.append(hit)
+        await async_engine.dispose()
+        return latencies, found, similarities
+
+    for label, queries in (("exact", exact), (f"perturbed {args.perturb:.0%}", perturbed)):
+        latencies, found, similarities = asyncio.run(lookups(queries))
+        print(f"lookup ({label}): p50 {statistics.median(latencies):.2f} ms, "
+              f"p95 {percentile(latencies, 0.95):.2f} ms, recall {found}/{len(queries)} "
+              f"(median similarity of hits {statistics.median(similarities or [0]):.2f})")
+
+    scan_ms = []
+    with engine.connect() as conn:
+        for source_id, user_id, q in perturbed[:args.scans]:
+            t = time.perf_counter()
+            tokens = shingles(q)
+            rows = conn.execute(
+                text("SELECT id, idea FROM startup_history WHERE user_id = :u"), {"u": user_id}
+            )
+            sorted(((jaccard(tokens, shingles(r.idea)), r.id) for r in rows), reverse=True)[:10]
+            scan_ms.append((time.perf_counter() - t) * 1000)
+    if scan_ms:
+        print(f"full scan: {statistics.median(scan_ms):,.0f} ms per query")
+
+if __name__ == "__main__":
+    main()
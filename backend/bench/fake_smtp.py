@@ -0,0 +1,91 @@
+"""
+Local SMTP stand-in for exercising the outbound email sender offline.
+Speaks enough ESMTP for smtplib (EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA,
+RSET, NOOP, QUIT), accepts any credentials and does not offer STARTTLS.
+
+    python bench/fake_smtp.py --port 2525 --fail-rate 0.1
+    SMTP_SERVER=127.0.0.1 SMTP_PORT=2525 SMTP_STARTTLS=false uvicorn main:app
+
+--fail-rate answers that share of DATA commands with a 451 so retries can be
+observed; --drop-after closes each connection after N messages.
+"""
+import random
+import asyncio
+import argparse
+from typing import Dict
+
+STATS: Dict[str, int] = {"connections": 0, "messages": 0, "rejected": 0}
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, args: argparse.Namespace) -> None:
+    STATS["connections"] += 1
+    sent_on_connection = 0
+
+    async def reply(line: str) -> None:
+        writer.write((line + "\r\n").encode())
+        await writer.drain()
+
+    await reply("220 fake-smtp ready")
+    try:
+        while True:
+            raw = await reader.readline()
+            if not raw:
+                break
+            command = raw.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                writer.write(b"250-fake-smtp\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+                await writer.drain()
+            elif verb == "HELO":
+                await reply("250 fake-smtp")
+            elif verb == "AUTH":
+                parts = command.split()
+                if len(parts) >= 2 and parts[1].upper() == "LOGIN":
+                    for prompt in ("334 VXNlcm5hbWU6", "334 UGFzc3dvcmQ6"):
+                        await reply(prompt)
+                        await reader.readline()
+                elif len(parts) == 2:
+                    await reply("334 ")
+                    await reader.readline()
+                await reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                await reply("250 OK")
+            elif verb == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                while True:
+                    line = await reader.readline()
+                    if not line or line in (b".\r\n", b".\n"):
+                        break
+                    size += len(line)
+                if random.random() < args.fail_rate:
+                    STATS["rejected"] += 1
+                    await reply("451 4.3.0 Temporary failure")
+                    continue
+                STATS["messages"] += 1
+                sent_on_connection += 1
+                print(f"[FAKE SMTP] message {STATS['messages']} ({size} bytes) stats={STATS}", flush=True)
+                await reply("250 OK queued")
+                if args.drop_after and sent_on_connection >= args.drop_after:
+                    break
+            elif verb == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("502 Command not implemented")
+    finally:
+        writer.close()
+
+async def main(args: argparse.Namespace) -> None:
+    server = await asyncio.start_server(lambda r, w: handle(r, w, args), args.host, args.port)
+    print(f"[FAKE SMTP] Listening on {args.host}:{args.port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--drop-after", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
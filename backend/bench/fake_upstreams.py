@@ -0,0 +1,245 @@
+"""
+Local stand-ins for the paid upstreams, for offline load tests.
+
+- POST /v1/chat/completions: OpenAI chat completions. Structured-output
+  requests (json_schema response_format or function tools) get a response
+  generated from the requested JSON schema.
+- POST /v2beta/stable-image/generate/core: Stability Image Core, returns a PNG.
+- GET /rdap/domain/{name}: RDAP lookup; --rdap-taken-rate of names (chosen by
+  hash, so stable across runs) are registered, the rest return 404.
+
+Latency is drawn from a configurable distribution and a configurable share
+of requests fail with 429/500. --llm-ms-per-output-token adds decode time in
+proportion to completion tokens, so fewer, larger calls are not free.
+
+    python bench/fake_upstreams.py --port 9100 --llm-latency lognormal:0.0,0.4 --error-rate 0.01
+
+Point the backend at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1
+    STABILITY_ENDPOINT=http://127.0.0.1:9100/v2beta/stable-image/generate/core
+    DOMAIN_RESOLVER=rdap DOMAIN_RDAP_URL=http://127.0.0.1:9100/rdap/domain/
+"""
+import json
+import time
+import zlib
+import random
+import struct
+import asyncio
+import hashlib
+import argparse
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+# ==============================================================
+# Latency / Error Injection
+# ==============================================================
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """fixed:S | uniform:LO,HI | normal:MEAN,STD | lognormal:MU,SIGMA (all in seconds)."""
+    kind, _, args = spec.partition(":")
+    params = [float(x) for x in args.split(",")] if args else []
+    if kind == "fixed":
+        return lambda: params[0]
+    if kind == "uniform":
+        return lambda: random.uniform(params[0], params[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(params[0], params[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(params[0], params[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+class FaultConfig:
+    def __init__(self, latency: str, error_rate: float):
+        self.spec = latency
+        self.sample = parse_latency(latency)
+        self.error_rate = error_rate
+
+    async def apply(self) -> Response:
+        await asyncio.sleep(self.sample())
+        if random.random() < self.error_rate:
+            status = random.choice([429, 500])
+            return JSONResponse({"error": {"message": "injected failure", "type": "fake_upstream"}}, status_code=status)
+        return None
+
+# ==============================================================
+# JSON Schema -> Fake Instance
+# ==============================================================
+
+def _resolve(schema: Dict[str, Any], root: Dict[str, Any]) -> Dict[str, Any]:
+    ref = schema.get("$ref")
+    if not ref:
+        return schema
+    node: Any = root
+    for part in ref.lstrip("#/").split("/"):
+        node = node[part]
+    return node
+
+def fake_instance(schema: Dict[str, Any], root: Dict[str, Any], name: str = "value") -> Any:
+    schema = _resolve(schema, root)
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = [s for s in schema[key] if _resolve(s, root).get("type") != "null"]
+            return fake_instance(options[0] if options else schema[key][0], root, name)
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "string")
+    if kind == "object":
+        return {k: fake_instance(v, root, k) for k, v in schema.get("properties", {}).items()}
+    if kind == "array":
+        count = max(schema.get("minItems", 3), 3)
+        return [fake_instance(schema.get("items", {"type": "string"}), root, name) for _ in range(count)]
+    if kind == "integer":
+        return random.randint(1, 100)
+    if kind == "number":
+        return round(random.uniform(1, 1000), 2)
+    if kind == "boolean":
+        return True
+    if "color" in name:
+        return "#%06x" % random.randint(0, 0xFFFFFF)
+    return f"Synthetic {name.replace('_', ' ')} {random.randint(1000, 9999)}"
+
+def _estimate_tokens(payload: Dict[str, Any]) -> int:
+    return max(1, len(json.dumps(payload.get("messages", []))) // 4)
+
+# ==============================================================
+# PNG Generator
+# ==============================================================
+
+def tiny_png(seed: str, size: int = 64) -> bytes:
+    """Solid-colour PNG; the colour is derived from the prompt so logos differ per brand."""
+    r, g, b = hashlib.sha256(seed.encode()).digest()[:3]
+    row = b"\x00" + bytes([r, g, b]) * size
+    raw = row * size
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+# ==============================================================
+# App
+# ==============================================================
+
+def create_app(
+    llm: FaultConfig,
+    image: FaultConfig,
+    ms_per_output_token: float = 0.0,
+    rdap: Optional[FaultConfig] = None,
+    rdap_taken_rate: float = 0.5,
+) -> FastAPI:
+    app = FastAPI(title="Fake Upstreams")
+    app.state.counts = {"chat": 0, "image": 0, "rdap": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    rdap = rdap or FaultConfig("fixed:0.02", 0.0)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        app.state.counts["chat"] += 1
+        failure = await llm.apply()
+        if failure is not None:
+            app.state.counts["errors"] += 1
+            return failure
+
+        message: Dict[str, Any] = {"role": "assistant", "content": None}
+        finish_reason = "stop"
+        response_format = payload.get("response_format") or {}
+        tools = payload.get("tools") or []
+
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"]["schema"]
+            message["content"] = json.dumps(fake_instance(schema, schema))
+        elif tools:
+            fn = tools[0]["function"]
+            args = fake_instance(fn.get("parameters", {}), fn.get("parameters", {}))
+            message["tool_calls"] = [{
+                "id": f"call_{random.getrandbits(32):08x}",
+                "type": "function",
+                "function": {"name": fn["name"], "arguments": json.dumps(args)},
+            }]
+            finish_reason = "tool_calls"
+        else:
+            message["content"] = "Hello from the fake upstream."
+
+        prompt_tokens = _estimate_tokens(payload)
+        completion_tokens = max(1, len(json.dumps(message)) // 4)
+        app.state.counts["prompt_tokens"] += prompt_tokens
+        app.state.counts["completion_tokens"] += completion_tokens
+        if ms_per_output_token:
+            await asyncio.sleep(completion_tokens * ms_per_output_token / 1000)
+        return {
+            "id": f"chatcmpl-{random.getrandbits(48):012x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/v2beta/stable-image/generate/core")
+    async def stable_image(request: Request):
+        form = await request.form()
+        app.state.counts["image"] += 1
+        failure = await image.apply()
+        if failure is not None:
+            app.state.counts["errors"] += 1
+            return failure
+        return Response(content=tiny_png(str(form.get("prompt", ""))), media_type="image/png")
+
+    @app.get("/rdap/domain/{name}")
+    async def rdap_domain(name: str):
+        app.state.counts["rdap"] += 1
+        failure = await rdap.apply()
+        if failure is not None:
+            app.state.counts["errors"] += 1
+            return failure
+        if int(hashlib.sha256(name.lower().encode()).hexdigest()[:8], 16) / 0xFFFFFFFF < rdap_taken_rate:
+            return JSONResponse(
+                {"objectClassName": "domain", "ldhName": name.upper(), "status": ["active"]},
+                media_type="application/rdap+json",
+            )
+        return JSONResponse({"errorCode": 404, "title": "Not Found"}, status_code=404, media_type="application/rdap+json")
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.counts
+
+    return app
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--llm-latency", default="lognormal:0.0,0.4")
+    parser.add_argument("--image-latency", default="uniform:1.0,3.0")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-ms-per-output-token", type=float, default=0.0)
+    parser.add_argument("--rdap-latency", default="fixed:0.02")
+    parser.add_argument("--rdap-taken-rate", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    app = create_app(
+        FaultConfig(args.llm_latency, args.error_rate),
+        FaultConfig(args.image_latency, args.error_rate),
+        args.llm_ms_per_output_token,
+        FaultConfig(args.rdap_latency, args.error_rate),
+        args.rdap_taken_rate,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Closed-loop load generator for the VentureMind backend.
+
+Drives one scenario at a fixed concurrency and reports p50/p95/p99 latency,
+throughput, error counts and memory, then saves the run as JSON under
+bench/results/ so runs can be compared across commits.
+
+    python bench/loadgen.py run --scenario chat --concurrency 16 --requests 200
+    python bench/loadgen.py compare bench/results/a.json bench/results/b.json
+
+Scenarios:
+    chat     POST /api/chat with a mix of unique and repeated ideas (--repeat-ratio)
+    history  GET /history/ and GET /history/{id} as a logged-in user
+    auth     POST /auth/signup followed by POST /auth/login
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import resource
+import statistics
+import subprocess
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+DEMO_IDEAS = [
+    "An app that matches dog owners with nearby dog walkers",
+    "AI tutor for high-school calculus",
+    "Marketplace for renting camping gear",
+    "Subscription box for indie board games",
+    "Carbon footprint tracker for small restaurants",
+]
+
+# ==============================================================
+# Stats
+# ==============================================================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+def summarize(latencies: List[float], errors: Dict[str, int], elapsed: float) -> Dict[str, Any]:
+    values = sorted(latencies)
+    total = len(values) + sum(errors.values())
+    return {
+        "requests": total,
+        "ok": len(values),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(values) * 1000, 1) if values else 0.0,
+            "p50": round(percentile(values, 50) * 1000, 1),
+            "p95": round(percentile(values, 95) * 1000, 1),
+            "p99": round(percentile(values, 99) * 1000, 1),
+            "max": round(values[-1] * 1000, 1) if values else 0.0,
+        },
+    }
+
+def rss_kb(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+# ==============================================================
+# Scenarios
+# ==============================================================
+
+Op = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+async def _login(client: httpx.AsyncClient) -> str:
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    password = "bench-password"
+    r = await client.post("/auth/signup", json={
+        "email": email, "password": password, "full_name": "Bench", "dob": "2000-01-01", "phone": "0",
+    })
+    r.raise_for_status()
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    r.raise_for_status()
+    return r.json()["access_token"]
+
+async def build_scenario(name: str, client: httpx.AsyncClient, args: argparse.Namespace) -> Op:
+    if name == "chat":
+        async def chat(c: httpx.AsyncClient) -> httpx.Response:
+            if random.random() < args.repeat_ratio:
+                idea = random.choice(DEMO_IDEAS)
+            else:
+                idea = f"{random.choice(DEMO_IDEAS)} for segment {uuid.uuid4().hex[:8]}"
+            return await c.post("/api/chat", json={"message": idea})
+        return chat
+
+    if name == "history":
+        token = await _login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        # Seed some packs so listing and detail have something to return
+        for idea in DEMO_IDEAS[: args.seed_items]:
+            (await client.post("/api/chat", json={"message": idea}, headers=headers)).raise_for_status()
+        items = (await client.get("/history/", headers=headers)).json()["items"]
+        ids = [i["id"] for i in items] or [0]
+
+        async def history(c: httpx.AsyncClient) -> httpx.Response:
+            if random.random() < 0.5:
+                return await c.get("/history/", headers=headers)
+            return await c.get(f"/history/{random.choice(ids)}", headers=headers)
+        return history
+
+    if name == "auth":
+        async def auth(c: httpx.AsyncClient) -> httpx.Response:
+            email = f"bench-{uuid.uuid4().hex}@example.com"
+            r = await c.post("/auth/signup", json={
+                "email": email, "password": "bench-password", "full_name": "Bench", "dob": "2000-01-01", "phone": "0",
+            })
+            if r.status_code >= 400:
+                return r
+            return await c.post("/auth/login", json={"email": email, "password": "bench-password"})
+        return auth
+
+    raise ValueError(f"Unknown scenario: {name}")
+
+# ==============================================================
+# Runner
+# ==============================================================
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        op = await build_scenario(args.scenario, client, args)
+
+        latencies: List[float] = []
+        errors: Dict[str, int] = {}
+        remaining = args.requests
+        deadline = time.perf_counter() + args.duration if args.duration else None
+        server_rss_peak = rss_kb(args.server_pid) if args.server_pid else None
+
+        async def worker() -> None:
+            nonlocal remaining, server_rss_peak
+            while True:
+                if deadline is not None:
+                    if time.perf_counter() >= deadline:
+                        return
+                else:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                start = time.perf_counter()
+                try:
+                    r = await op(client)
+                    if r.status_code >= 400:
+                        errors[str(r.status_code)] = errors.get(str(r.status_code), 0) + 1
+                    else:
+                        latencies.append(time.perf_counter() - start)
+                except Exception as e:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                if args.server_pid:
+                    server_rss_peak = max(server_rss_peak or 0, rss_kb(args.server_pid) or 0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    result = summarize(latencies, errors, elapsed)
+    result.update({
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "git_revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "label": args.label,
+        "memory_kb": {
+            "loadgen_max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "server_rss_peak": server_rss_peak,
+        },
+    })
+    return result
+
+def save(result: Dict[str, Any]) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    name = f"{result['timestamp'].replace(':', '')}-{result['git_revision']}-{result['scenario']}.json"
+    path = os.path.join(RESULTS_DIR, name)
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    return path
+
+def compare(paths: List[str]) -> None:
+    runs = []
+    for path in paths:
+        with open(path) as f:
+            runs.append(json.load(f))
+    base = runs[0]
+    print(f"{'run':<36} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for run_ in runs:
+        lat = run_["latency_ms"]
+        label = f"{run_['git_revision']} {run_['scenario']} {run_.get('label') or ''}".strip()
+        delta = ""
+        if run_ is not base and base["latency_ms"]["p95"]:
+            delta = f"  ({(lat['p95'] / base['latency_ms']['p95'] - 1) * 100:+.1f}% p95)"
+        print(f"{label:<36} {run_['rps']:>8} {lat['p50']:>9} {lat['p95']:>9} {lat['p99']:>9} "
+              f"{sum(run_['errors'].values()):>7}{delta}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    r = sub.add_parser("run")
+    r.add_argument("--url", default="http://127.0.0.1:8000")
+    r.add_argument("--scenario", choices=["chat", "history", "auth"], default="chat")
+    r.add_argument("--concurrency", type=int, default=8)
+    r.add_argument("--requests", type=int, default=100)
+    r.add_argument("--duration", type=float, default=None, help="Run for N seconds instead of a request count")
+    r.add_argument("--repeat-ratio", type=float, default=0.5)
+    r.add_argument("--seed-items", type=int, default=5)
+    r.add_argument("--timeout", type=float, default=120.0)
+    r.add_argument("--server-pid", type=int, default=None)
+    r.add_argument("--label", default="")
+    r.add_argument("--no-save", action="store_true")
+
+    c = sub.add_parser("compare")
+    c.add_argument("paths", nargs="+")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        compare(args.paths)
+        return
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if not args.no_save:
+        print(f"[BENCH] Saved {save(result)}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
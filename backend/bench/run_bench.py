@@ -0,0 +1,97 @@
+"""
+One-shot offline benchmark: starts the fake upstreams and the backend (in a
+scratch directory with a fresh SQLite DB), runs loadgen for each scenario,
+saves results under bench/results/ and shuts everything down.
+
+    python bench/run_bench.py --scenarios chat,history,auth --concurrency 16 --requests 200
+    python bench/run_bench.py --llm-latency fixed:0.05 --image-latency fixed:0.1 --error-rate 0.02
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+def wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="chat,history,auth")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--repeat-ratio", type=float, default=0.5)
+    parser.add_argument("--llm-latency", default="lognormal:-1.0,0.4")
+    parser.add_argument("--image-latency", default="uniform:0.5,1.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--upstream-port", type=int, default=9100)
+    parser.add_argument("--backend-port", type=int, default=8100)
+    parser.add_argument("--label", default="")
+    args = parser.parse_args()
+
+    upstream_url = f"http://127.0.0.1:{args.upstream_port}"
+    backend_url = f"http://127.0.0.1:{args.backend_port}"
+    workdir = tempfile.mkdtemp(prefix="venturemind-bench-")
+
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_KEY": "sk-bench",
+        "STABILITY_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": f"{upstream_url}/v1",
+        "STABILITY_ENDPOINT": f"{upstream_url}/v2beta/stable-image/generate/core",
+        "DOMAIN_RESOLVER": "rdap",
+        "DOMAIN_RDAP_URL": f"{upstream_url}/rdap/domain/",
+    })
+
+    procs = []
+    try:
+        procs.append(subprocess.Popen([
+            sys.executable, os.path.join(BENCH_DIR, "fake_upstreams.py"),
+            "--port", str(args.upstream_port),
+            "--llm-latency", args.llm_latency,
+            "--image-latency", args.image_latency,
+            "--error-rate", str(args.error_rate),
+        ], env=env))
+        wait_ready(f"{upstream_url}/stats")
+
+        backend = subprocess.Popen([
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--app-dir", BACKEND_DIR, "--port", str(args.backend_port), "--log-level", "warning",
+        ], cwd=workdir, env=env, stdout=subprocess.DEVNULL)
+        procs.append(backend)
+        wait_ready(f"{backend_url}/")
+
+        for scenario in args.scenarios.split(","):
+            print(f"[BENCH] Scenario: {scenario}", file=sys.stderr)
+            subprocess.run([
+                sys.executable, os.path.join(BENCH_DIR, "loadgen.py"), "run",
+                "--url", backend_url,
+                "--scenario", scenario,
+                "--concurrency", str(args.concurrency),
+                "--requests", str(args.requests),
+                "--repeat-ratio", str(args.repeat_ratio),
+                "--server-pid", str(backend.pid),
+                "--label", args.label,
+            ], check=True, cwd=BACKEND_DIR)
+
+        print("[BENCH] Upstream calls:", httpx.get(f"{upstream_url}/stats").json(), file=sys.stderr)
+    finally:
+        for proc in reversed(procs):
+            proc.terminate()
+            proc.wait(timeout=10)
+
+if __name__ == "__main__":
+    main()
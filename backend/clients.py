@@ -0,0 +1,109 @@
+import os
+from typing import Dict, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+load_dotenv()
+
+# ==============================================================
+# Config
+# ==============================================================
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+STABILITY_ENDPOINT = os.getenv(
+    "STABILITY_ENDPOINT", "https://api.stability.ai/v2beta/stable-image/generate/core"
+)
+STABILITY_TIMEOUT_SECONDS = float(os.getenv("STABILITY_TIMEOUT_SECONDS", "60"))
+RDAP_TIMEOUT_SECONDS = float(os.getenv("RDAP_TIMEOUT_SECONDS", "5"))
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+# ==============================================================
+# Process-wide Client Registry
+# ==============================================================
+
+class ClientRegistry:
+    """
+    Lazily builds and then reuses one keep-alive connection pool per
+    upstream, plus one ChatOpenAI per (model, temperature). Call aclose()
+    on shutdown.
+    """
+
+    def __init__(self):
+        self._openai_http: Optional[httpx.AsyncClient] = None
+        self._stability_http: Optional[httpx.AsyncClient] = None
+        self._rdap_http: Optional[httpx.AsyncClient] = None
+        self._llms: Dict[Tuple[str, float], ChatOpenAI] = {}
+
+    def openai_http(self) -> httpx.AsyncClient:
+        if self._openai_http is None:
+            self._openai_http = httpx.AsyncClient(
+                limits=_limits(),
+                timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT),
+            )
+        return self._openai_http
+
+    def stability_http(self) -> httpx.AsyncClient:
+        if self._stability_http is None:
+            self._stability_http = httpx.AsyncClient(
+                limits=_limits(),
+                timeout=httpx.Timeout(STABILITY_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT),
+            )
+        return self._stability_http
+
+    def rdap_http(self) -> httpx.AsyncClient:
+        if self._rdap_http is None:
+            # rdap.org answers with a redirect to the TLD's own RDAP server
+            self._rdap_http = httpx.AsyncClient(
+                limits=_limits(),
+                timeout=httpx.Timeout(RDAP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT),
+                follow_redirects=True,
+                headers={"Accept": "application/rdap+json"},
+            )
+        return self._rdap_http
+
+    def get_llm(self, model: str = LLM_MODEL, temperature: float = 0.7) -> ChatOpenAI:
+        key = (model, temperature)
+        llm = self._llms.get(key)
+        if llm is None:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY missing in .env")
+            llm = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                openai_api_key=api_key,
+                base_url=OPENAI_BASE_URL,
+                timeout=LLM_TIMEOUT_SECONDS,
+                max_retries=LLM_MAX_RETRIES,
+                http_async_client=self.openai_http(),
+            )
+            self._llms[key] = llm
+        return llm
+
+    async def aclose(self) -> None:
+        self._llms.clear()
+        for client in (self._openai_http, self._stability_http, self._rdap_http):
+            if client is not None:
+                await client.aclose()
+        self._openai_http = None
+        self._stability_http = None
+        self._rdap_http = None
+
+clients = ClientRegistry()
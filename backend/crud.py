@@ -0,0 +1,27 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import models
+from pack_storage import encode_pack
+
+def search_fields(
+    startup_pack: Dict[str, Any], competitor_matrix: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[str, str]:
+    """(brand_name, competitors_text) for the full-text index."""
+    brand = startup_pack.get("brand") or {}
+    names = list(startup_pack.get("competitors") or [])
+    names += [row.get("name", "") for row in competitor_matrix or startup_pack.get("competitor_matrix") or []]
+    brand_name = " ".join(n for n in (brand.get("name"), brand.get("alt_name")) if n)
+    return brand_name, "; ".join(n for n in names if n)
+
+def build_history_item(
+    user_id: int, idea: str, summary: str, brand_name: str, competitors_text: str, pack_json: bytes
+) -> models.StartupHistory:
+    """pack_json is the already-serialized StartupPack; it is compressed, never re-encoded."""
+    return models.StartupHistory(
+        user_id=user_id,
+        idea=idea,
+        summary=summary,
+        brand_name=brand_name,
+        competitors_text=competitors_text,
+        full_json_blob=encode_pack(pack_json)
+    )
@@ -0,0 +1,286 @@
+import os
+import re
+import math
+import time
+import socket
+import struct
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from clients import clients
+from metrics import DOMAIN_LOOKUPS
+
+# ==============================================================
+# Config
+# ==============================================================
+
+DOMAIN_TLDS = [t.strip() for t in os.getenv("DOMAIN_TLDS", ".com,.in,.ai,.io").split(",") if t.strip()]
+DOMAIN_MAX_CANDIDATES = int(os.getenv("DOMAIN_MAX_CANDIDATES", "12"))
+# dns | rdap | static (see RESOLVERS)
+DOMAIN_RESOLVER = os.getenv("DOMAIN_RESOLVER", "dns")
+DOMAIN_RDAP_URL = os.getenv("DOMAIN_RDAP_URL", "https://rdap.org/domain/")
+# Comma-separated registered domains for the static resolver (local testing)
+DOMAIN_STATIC_TAKEN = os.getenv("DOMAIN_STATIC_TAKEN", "")
+DOMAIN_LOOKUP_CONCURRENCY = int(os.getenv("DOMAIN_LOOKUP_CONCURRENCY", "16"))
+DOMAIN_LOOKUP_TIMEOUT_SECONDS = float(os.getenv("DOMAIN_LOOKUP_TIMEOUT_SECONDS", "3"))
+DOMAIN_CACHE_TTL_SECONDS = int(os.getenv("DOMAIN_CACHE_TTL_SECONDS", "3600"))
+DOMAIN_CACHE_MAX_ENTRIES = int(os.getenv("DOMAIN_CACHE_MAX_ENTRIES", "50000"))
+# Registered-domains list or zone file (first field per line). Optional.
+DOMAIN_INDEX_FILE = os.getenv("DOMAIN_INDEX_FILE", "")
+DOMAIN_INDEX_ERROR_RATE = float(os.getenv("DOMAIN_INDEX_ERROR_RATE", "0.001"))
+
+AVAILABLE, TAKEN, UNKNOWN = "available", "taken", "unknown"
+Lookup = Tuple[str, str]  # (availability, comment)
+
+# ==============================================================
+# Candidates
+# ==============================================================
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+def domain_candidates(names: Iterable[str], tlds: List[str] = DOMAIN_TLDS, limit: int = DOMAIN_MAX_CANDIDATES) -> List[str]:
+    """Brand name first, then alt name, then "get"/"app" variants, each across all TLDs."""
+    bases: List[str] = []
+    slugs = [s for s in (_slug(n) for n in names if n) if s]
+    for variant in (lambda s: s, lambda s: "get" + s, lambda s: s + "app"):
+        for slug in slugs:
+            base = variant(slug)[:63]
+            if base not in bases:
+                bases.append(base)
+    return [base + tld for base in bases for tld in tlds][:limit]
+
+# ==============================================================
+# Bloom Filter Index of Registered Domains
+# ==============================================================
+
+class BloomFilter:
+    """Bit-array Bloom filter with k indices derived from one blake2b digest (double hashing)."""
+
+    _HEADER = struct.Struct("<QI")  # bit count, hash count
+
+    def __init__(self, capacity: int, error_rate: float = DOMAIN_INDEX_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _indices(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, key: str) -> None:
+        for i in self._indices(key):
+            self._array[i >> 3] |= 1 << (i & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._array[i >> 3] & (1 << (i & 7)) for i in self._indices(key))
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self._HEADER.pack(self.bits, self.hashes))
+            f.write(self._array)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            bits, hashes = cls._HEADER.unpack(f.read(cls._HEADER.size))
+            bloom = cls.__new__(cls)
+            bloom.bits, bloom.hashes, bloom.count = bits, hashes, 0
+            bloom._array = bytearray(f.read())
+        return bloom
+
+def _registry_lines(path: str) -> Iterator[str]:
+    """Domain names from a plain list or a zone file: first field, lowercased, without the root dot."""
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line[0] in "#;$":
+                continue
+            yield line.split()[0].rstrip(".").lower()
+
+def build_index(path: str, error_rate: float = DOMAIN_INDEX_ERROR_RATE) -> BloomFilter:
+    """
+    Bloom filter over every domain in `path`. The result is cached next to
+    the file as <path>.bloom and rebuilt only when the file is newer.
+    """
+    cached = path + ".bloom"
+    if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+        return BloomFilter.load(cached)
+    bloom = BloomFilter(sum(1 for _ in _registry_lines(path)), error_rate)
+    for domain in _registry_lines(path):
+        bloom.add(domain)
+    try:
+        bloom.save(cached)
+    except OSError as e:
+        print("[DOMAINS] Could not cache index:", e)
+    return bloom
+
+# ==============================================================
+# Resolvers
+# ==============================================================
+
+class DomainResolver(ABC):
+    """Checks one fully-qualified domain; returns (availability, comment)."""
+
+    name = "base"
+
+    @abstractmethod
+    async def check(self, domain: str) -> Lookup: ...
+
+class DnsResolver(DomainResolver):
+    """Registered domains almost always publish DNS; NXDOMAIN means very likely unregistered."""
+
+    name = "dns"
+
+    async def check(self, domain: str) -> Lookup:
+        try:
+            await asyncio.get_running_loop().getaddrinfo(domain, None, proto=socket.IPPROTO_TCP)
+            return TAKEN, "Resolves in DNS"
+        except socket.gaierror as e:
+            if e.errno in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)):
+                return AVAILABLE, "No DNS records; likely unregistered"
+            return UNKNOWN, f"DNS error: {e}"
+
+class RdapResolver(DomainResolver):
+    """Registry lookup over RDAP: 404 is unregistered, 200 is registered."""
+
+    name = "rdap"
+
+    def __init__(self, base_url: str = DOMAIN_RDAP_URL):
+        self.base_url = base_url
+
+    async def check(self, domain: str) -> Lookup:
+        resp = await clients.rdap_http().get(self.base_url + domain)
+        if resp.status_code == 404:
+            return AVAILABLE, "Not found in registry (RDAP)"
+        if resp.status_code == 200:
+            return TAKEN, "Registered (RDAP)"
+        return UNKNOWN, f"RDAP status {resp.status_code}"
+
+class StaticResolver(DomainResolver):
+    """Answers from a fixed set of registered domains; for local runs and tests."""
+
+    name = "static"
+
+    def __init__(self, taken: Optional[Set[str]] = None):
+        self.taken = {d.strip().lower() for d in (taken or DOMAIN_STATIC_TAKEN.split(",")) if d.strip()}
+
+    async def check(self, domain: str) -> Lookup:
+        if domain in self.taken:
+            return TAKEN, "Registered (static list)"
+        return AVAILABLE, "Not in static list"
+
+RESOLVERS: Dict[str, Callable[[], DomainResolver]] = {
+    "dns": DnsResolver,
+    "rdap": RdapResolver,
+    "static": StaticResolver,
+}
+
+# ==============================================================
+# Engine
+# ==============================================================
+
+class DomainEngine:
+    """
+    Checks candidate domains concurrently. Each lookup is answered by, in
+    order: the registry Bloom index (a hit means registered, never leaves
+    the process), the TTL cache, then the resolver. "unknown" results are
+    not cached.
+    """
+
+    def __init__(
+        self,
+        resolver: DomainResolver,
+        index: Optional[BloomFilter] = None,
+        ttl_seconds: int = DOMAIN_CACHE_TTL_SECONDS,
+        max_entries: int = DOMAIN_CACHE_MAX_ENTRIES,
+        concurrency: int = DOMAIN_LOOKUP_CONCURRENCY,
+        timeout: float = DOMAIN_LOOKUP_TIMEOUT_SECONDS,
+    ):
+        self.resolver = resolver
+        self.index = index
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._sem = asyncio.Semaphore(concurrency)
+        self._cache: "OrderedDict[str, Tuple[float, Lookup]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Lookup]"] = {}
+
+    def load_index(self, path: str = DOMAIN_INDEX_FILE) -> None:
+        if not path:
+            return
+        start = time.perf_counter()
+        self.index = build_index(path)
+        print(f"[DOMAINS] Registry index loaded from {path} in {time.perf_counter() - start:.1f}s.")
+
+    def _cached(self, domain: str) -> Optional[Lookup]:
+        entry = self._cache.get(domain)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._cache[domain]
+            return None
+        self._cache.move_to_end(domain)
+        return entry[1]
+
+    def _store(self, domain: str, result: Lookup) -> None:
+        self._cache[domain] = (time.monotonic() + self.ttl_seconds, result)
+        self._cache.move_to_end(domain)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _resolve(self, domain: str) -> Lookup:
+        async with self._sem:
+            try:
+                return await asyncio.wait_for(self.resolver.check(domain), self.timeout)
+            except asyncio.TimeoutError:
+                return UNKNOWN, "Lookup timed out"
+            except Exception as e:
+                return UNKNOWN, f"Lookup failed: {e}"
+
+    async def check(self, domain: str) -> Lookup:
+        domain = domain.lower()
+        if self.index is not None and domain in self.index:
+            DOMAIN_LOOKUPS.inc("index", TAKEN)
+            return TAKEN, "Registered (local registry index)"
+        cached = self._cached(domain)
+        if cached is not None:
+            DOMAIN_LOOKUPS.inc("cache", cached[0])
+            return cached
+
+        # Concurrent checks of the same domain share one lookup
+        pending = self._inflight.get(domain)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.ensure_future(self._resolve(domain))
+        self._inflight[domain] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            self._inflight.pop(domain, None)
+        DOMAIN_LOOKUPS.inc(self.resolver.name, result[0])
+        if result[0] != UNKNOWN:
+            self._store(domain, result)
+        return result
+
+    async def check_many(self, domains: List[str]) -> List[Tuple[str, Lookup]]:
+        results = await asyncio.gather(*(self.check(d) for d in domains))
+        return list(zip(domains, results))
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "resolver": self.resolver.name,
+            "cache_entries": len(self._cache),
+            "index_bits": self.index.bits if self.index is not None else 0,
+        }
+
+if DOMAIN_RESOLVER not in RESOLVERS:
+    print(f"[DOMAINS] Unknown DOMAIN_RESOLVER '{DOMAIN_RESOLVER}', using dns.")
+domain_engine = DomainEngine(RESOLVERS.get(DOMAIN_RESOLVER, DnsResolver)())
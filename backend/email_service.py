@@ -1,31 +1,52 @@
 import os
+import re
+import time
+import random
 import smtplib
+import asyncio
+import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import Any, Dict, List, Optional
 
-def send_welcome_email(to_email: str):
-    """
-    Sends a welcome email to the user.
-    If SMTP env vars are not set, logs to console instead (Simulation).
-    """
-    smtp_server = os.getenv("SMTP_SERVER")
-    smtp_port = os.getenv("SMTP_PORT", "587")
-    smtp_user = os.getenv("SMTP_USER")
-    smtp_password = os.getenv("SMTP_PASSWORD")
-    sender_email = os.getenv("SENDER_EMAIL", "noreply@venturemind.ai")
-
-    subject = "Welcome to VentureMind.AI – Let's Build the Future"
-    
-    body = f"""
+from database import SessionLocal
+import models
+
+# ==============================================================
+# Config
+# ==============================================================
+
+SMTP_SERVER = os.getenv("SMTP_SERVER")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+SENDER_EMAIL = os.getenv("SENDER_EMAIL", "noreply@venturemind.ai")
+
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_BACKOFF_BASE_SECONDS = float(os.getenv("EMAIL_BACKOFF_BASE_SECONDS", "30"))
+EMAIL_POLL_INTERVAL_SECONDS = float(os.getenv("EMAIL_POLL_INTERVAL_SECONDS", "5"))
+# Close the pooled SMTP connection after this long without sending
+EMAIL_IDLE_DISCONNECT_SECONDS = float(os.getenv("EMAIL_IDLE_DISCONNECT_SECONDS", "60"))
+
+# ==============================================================
+# Templates (rendered once at import)
+# ==============================================================
+
+WELCOME_SUBJECT = "Welcome to VentureMind.AI – Let's Build the Future"
+
+WELCOME_HTML = """
     <html>
     <head>
         <style>
-            body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f3f4f6; padding: 20px; }}
-            .container {{ max-width: 600px; margin: 0 auto; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-            h1 {{ color: #111827; font-size: 24px; margin-bottom: 10px; }}
-            p {{ color: #4b5563; font-size: 16px; line-height: 1.6; }}
-            .btn {{ display: inline-block; background-color: #2563eb; color: white !important; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: bold; margin-top: 20px; }}
-            .footer {{ margin-top: 30px; font-size: 12px; color: #9ca3af; text-align: center; border-top: 1px solid #e5e7eb; padding-top: 20px; }}
+            body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f3f4f6; padding: 20px; }
+            .container { max-width: 600px; margin: 0 auto; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }
+            h1 { color: #111827; font-size: 24px; margin-bottom: 10px; }
+            p { color: #4b5563; font-size: 16px; line-height: 1.6; }
+            .btn { display: inline-block; background-color: #2563eb; color: white !important; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: bold; margin-top: 20px; }
+            .footer { margin-top: 30px; font-size: 12px; color: #9ca3af; text-align: center; border-top: 1px solid #e5e7eb; padding-top: 20px; }
         </style>
     </head>
     <body>
@@ -55,34 +76,163 @@ def send_welcome_email(to_email: str):
         </div>
     </body>
     </html>
+"""
+
+# Plain-text preview used by the console simulation
+WELCOME_PREVIEW = re.sub(
+    "<[^<]+?>", "", WELCOME_HTML.replace("<br>", "\n").replace("</p>", "\n").replace("</li>", "\n")
+)[:500]
+
+def welcome_email(to_email: str) -> models.OutboundEmail:
+    """Outbox row for the welcome email; add it in the same transaction as the new user."""
+    return models.OutboundEmail(to_email=to_email, subject=WELCOME_SUBJECT, body_html=WELCOME_HTML)
+
+# ==============================================================
+# Background Sender
+# ==============================================================
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+class EmailSender:
+    """
+    Drains the outbound_emails table in the background. Sends reuse one
+    authenticated SMTP connection, which is dropped after
+    EMAIL_IDLE_DISCONNECT_SECONDS idle or on error. Failed messages are
+    retried with exponential backoff up to EMAIL_MAX_ATTEMPTS. Without
+    SMTP_SERVER the emails are printed instead (simulation).
     """
 
-    if not (smtp_server and smtp_user and smtp_password):
-        print(f"\n[EMAIL SERVICE] 📧 Simulation: Sending Welcome Email to {to_email}")
-        print("-" * 60)
-        print(f"Subject: {subject}")
-        # Print a preview of the body (stripped of tags for readability in log)
-        preview = body.replace("<br>", "\n").replace("</p>", "\n").replace("</li>", "\n")
-        import re
-        text_only = re.sub('<[^<]+?>', '', preview)
-        print(text_only[:500] + "...\n[End of Email Preview]")
-        print("-" * 60 + "\n")
-        return True
-
-    try:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.stats = {"sent": 0, "retried": 0, "failed": 0, "connections": 0}
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self._recover)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.to_thread(self._disconnect)
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            sent = await asyncio.to_thread(self._drain_once)
+            if sent:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), EMAIL_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            if self._smtp is not None and time.monotonic() - self._last_used > EMAIL_IDLE_DISCONNECT_SECONDS:
+                await asyncio.to_thread(self._disconnect)
+
+    # --- queue (sync; runs in a worker thread) ---
+
+    def _recover(self) -> None:
+        with SessionLocal() as db:
+            db.query(models.OutboundEmail).filter(models.OutboundEmail.status == "sending").update(
+                {"status": "queued"}, synchronize_session=False
+            )
+            db.commit()
+
+    def _claim(self, db) -> List[models.OutboundEmail]:
+        due = (
+            db.query(models.OutboundEmail)
+            .filter(models.OutboundEmail.status == "queued", models.OutboundEmail.next_attempt_at <= _now())
+            .order_by(models.OutboundEmail.next_attempt_at)
+            .limit(EMAIL_BATCH_SIZE)
+            .all()
+        )
+        for row in due:
+            row.status = "sending"
+        db.commit()
+        return due
+
+    def _drain_once(self) -> int:
+        """Sends one batch of due emails; returns how many were processed."""
+        with SessionLocal() as db:
+            batch = self._claim(db)
+            for row in batch:
+                try:
+                    self._deliver(row)
+                    row.status = "sent"
+                    row.sent_at = _now()
+                    self.stats["sent"] += 1
+                except Exception as e:
+                    # An SMTP error reply leaves the session usable; anything else may not
+                    if not isinstance(e, smtplib.SMTPResponseException):
+                        self._disconnect()
+                    row.attempts = (row.attempts or 0) + 1
+                    row.last_error = str(e)
+                    if row.attempts >= EMAIL_MAX_ATTEMPTS:
+                        row.status = "failed"
+                        self.stats["failed"] += 1
+                        print(f"[EMAIL SERVICE] Giving up on email {row.id} to {row.to_email}: {e}")
+                    else:
+                        delay = EMAIL_BACKOFF_BASE_SECONDS * 2 ** (row.attempts - 1)
+                        row.status = "queued"
+                        row.next_attempt_at = _now() + datetime.timedelta(seconds=delay * random.uniform(0.8, 1.2))
+                        self.stats["retried"] += 1
+                        print(f"[EMAIL SERVICE] Error sending email {row.id} (attempt {row.attempts}): {e}")
+                db.commit()
+            return len(batch)
+
+    # --- SMTP (sync; runs in a worker thread) ---
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            smtp = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT_SECONDS)
+            if SMTP_STARTTLS:
+                smtp.starttls()
+            if SMTP_USER and SMTP_PASSWORD:
+                smtp.login(SMTP_USER, SMTP_PASSWORD)
+            self._smtp = smtp
+            self.stats["connections"] += 1
+        return self._smtp
+
+    def _disconnect(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def _deliver(self, row: models.OutboundEmail) -> None:
+        if not SMTP_SERVER:
+            print(f"\n[EMAIL SERVICE] 📧 Simulation: Sending email to {row.to_email}")
+            print("-" * 60)
+            print(f"Subject: {row.subject}")
+            preview = WELCOME_PREVIEW if row.body_html == WELCOME_HTML else row.body_html[:500]
+            print(preview + "...\n[End of Email Preview]")
+            print("-" * 60 + "\n")
+            return
+
         msg = MIMEMultipart()
-        msg["From"] = sender_email
-        msg["To"] = to_email
-        msg["Subject"] = subject
-        msg.attach(MIMEText(body, "html"))
-
-        server = smtplib.SMTP(smtp_server, int(smtp_port))
-        server.starttls()
-        server.login(smtp_user, smtp_password)
-        server.sendmail(sender_email, to_email, msg.as_string())
-        server.quit()
-        print(f"[EMAIL SERVICE] Sent Welcome Email to {to_email}")
-        return True
-    except Exception as e:
-        print(f"[EMAIL SERVICE] Error sending email: {e}")
-        return False
+        msg["From"] = SENDER_EMAIL
+        msg["To"] = row.to_email
+        msg["Subject"] = row.subject
+        msg.attach(MIMEText(row.body_html, "html"))
+        try:
+            self._connect().sendmail(SENDER_EMAIL, row.to_email, msg.as_string())
+        except smtplib.SMTPServerDisconnected:
+            # The pooled connection went stale; reconnect once
+            self._disconnect()
+            self._connect().sendmail(SENDER_EMAIL, row.to_email, msg.as_string())
+        self._last_used = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+email_sender = EmailSender()
@@ -0,0 +1,244 @@
+import os
+import itertools
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+# ==============================================================
+# Config
+# ==============================================================
+
+FINANCIAL_HORIZON_MONTHS = int(os.getenv("FINANCIAL_HORIZON_MONTHS", "36"))
+FINANCIAL_MAX_MONTHS = 60
+FINANCIAL_MAX_DRAWS = int(os.getenv("FINANCIAL_MAX_DRAWS", "20000"))
+FINANCIAL_MAX_SWEEP = int(os.getenv("FINANCIAL_MAX_SWEEP", "10000"))
+# 100% a month is already far beyond any real marketing budget
+FINANCIAL_MAX_MONTHLY_GROWTH = 1.0
+FINANCIAL_MAX_SPREAD = 1.0
+
+# Drivers that vary in Monte Carlo runs; the rest are decisions, not estimates
+UNCERTAIN_DRIVERS = ("price", "cac", "churn", "monthly_growth", "gross_margin")
+
+# ==============================================================
+# Drivers
+# ==============================================================
+
+class FinancialDrivers(BaseModel):
+    """Monthly unit economics a projection is computed from (currency: USD)."""
+    price: float                        # revenue per customer per month
+    cac: float                          # cost to acquire one customer
+    churn: float                        # share of customers lost per month, 0-1
+    headcount: float
+    monthly_growth: float               # growth of the marketing budget per month, e.g. 0.05
+    marketing_budget: float = 10000.0   # marketing spend in month 1
+    salary_per_head: float = 8000.0
+    other_fixed_costs: float = 5000.0
+    gross_margin: float = 0.7
+    starting_customers: float = 0.0
+    initial_capital: float = 500000.0
+
+DRIVER_NAMES = tuple(FinancialDrivers.model_fields)
+
+def validate_drivers(d: Dict[str, np.ndarray]) -> None:
+    for name in DRIVER_NAMES:
+        if not np.all(np.isfinite(d[name])):
+            raise ValueError(f"{name} must be a finite number.")
+    if np.any(d["price"] < 0) or np.any(d["cac"] <= 0):
+        raise ValueError("price must be >= 0 and cac > 0.")
+    if np.any((d["churn"] < 0) | (d["churn"] > 1)) or np.any((d["gross_margin"] < 0) | (d["gross_margin"] > 1)):
+        raise ValueError("churn and gross_margin must be between 0 and 1.")
+    if np.any((d["monthly_growth"] <= -1) | (d["monthly_growth"] > FINANCIAL_MAX_MONTHLY_GROWTH)):
+        raise ValueError(f"monthly_growth must be greater than -1 and at most {FINANCIAL_MAX_MONTHLY_GROWTH}.")
+    for name in ("headcount", "marketing_budget", "salary_per_head", "other_fixed_costs", "starting_customers"):
+        if np.any(d[name] < 0):
+            raise ValueError(f"{name} must be >= 0.")
+
+def _check_months(months: int) -> None:
+    if not 1 <= months <= FINANCIAL_MAX_MONTHS:
+        raise ValueError(f"months must be between 1 and {FINANCIAL_MAX_MONTHS}.")
+
+# ==============================================================
+# Projection Engine (vectorized over scenarios)
+# ==============================================================
+
+def project(d: Dict[str, np.ndarray], months: int) -> Dict[str, np.ndarray]:
+    """
+    Projects N scenarios at once. Every driver is an array of shape (N,);
+    monthly series come back as (N, months) and summaries as (N,).
+    Month indices in summaries are 1-based; NaN means "not within the horizon".
+    """
+    t = np.arange(months)
+    g = 1 + d["monthly_growth"][:, None]
+    r = 1 - d["churn"][:, None]
+    g_pow, r_pow = g ** (t + 1), r ** (t + 1)
+    marketing = d["marketing_budget"][:, None] * g_pow / g
+
+    # c[t] = c[t-1] * r + new[t] with new[t] = new[0] * g^t has the closed form
+    # c[t] = c0 * r^(t+1) + new[0] * sum_k g^k r^(t-k), a geometric sum
+    diff = g - r
+    close = np.abs(diff) < 1e-9
+    geometric = (g_pow - r_pow) / np.where(close, 1.0, diff)
+    if close.any():
+        # g == r: the sum is (t + 1) * r^t
+        geometric = np.where(close, (t + 1) * r ** t, geometric)
+    customers = d["starting_customers"][:, None] * r_pow + (d["marketing_budget"] / d["cac"])[:, None] * geometric
+
+    revenue = customers * d["price"][:, None]
+    fixed = (d["headcount"] * d["salary_per_head"] + d["other_fixed_costs"])[:, None]
+    costs = fixed + marketing
+    net = revenue * d["gross_margin"][:, None] - costs
+    cumulative = np.cumsum(net, axis=1)
+    cash = d["initial_capital"][:, None] + cumulative
+
+    capital_required = np.maximum(0.0, -cumulative.min(axis=1))
+    unprofitable = net < 0
+    burn = np.where(unprofitable, -net, 0.0).sum(axis=1) / np.maximum(unprofitable.sum(axis=1), 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(capital_required > 0, cumulative[:, -1] / capital_required, np.nan)
+
+    # Finite drivers can still overflow (e.g. huge prices in a sweep); never return inf/NaN series
+    if not all(np.all(np.isfinite(a)) for a in (customers, revenue, costs, cash)):
+        raise ValueError("These drivers produce figures too large to project.")
+
+    return {
+        "customers": customers,
+        "revenue": revenue,
+        "costs": costs,
+        "net_cashflow": net,
+        "cash": cash,
+        "break_even_month": _first_month(net >= 0),
+        "runway_months": _first_month(cash < 0) - 1,
+        "burn_rate": burn,
+        "capital_required": capital_required,
+        "roi": roi,
+        "total_revenue": revenue.sum(axis=1),
+        "arr": revenue[:, -1] * 12,
+    }
+
+def _first_month(mask: np.ndarray) -> np.ndarray:
+    """1-based index of the first True per row, NaN if there is none."""
+    first = mask.argmax(axis=1).astype(float) + 1
+    first[~mask.any(axis=1)] = np.nan
+    return first
+
+def _arrays(drivers: FinancialDrivers, n: int = 1) -> Dict[str, np.ndarray]:
+    values = drivers.model_dump()
+    return {k: np.full(n, float(values[k])) for k in DRIVER_NAMES}
+
+SUMMARY_KEYS = ("break_even_month", "runway_months", "burn_rate", "capital_required", "roi", "total_revenue", "arr")
+
+def _scalar(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 4)
+
+# ==============================================================
+# Public API
+# ==============================================================
+
+def projection(drivers: FinancialDrivers, months: int = FINANCIAL_HORIZON_MONTHS) -> Dict[str, Any]:
+    """Deterministic projection of one set of drivers: monthly series plus summary."""
+    _check_months(months)
+    d = _arrays(drivers)
+    validate_drivers(d)
+    out = project(d, months)
+    series = {k: np.round(out[k][0], 2).tolist() for k in ("customers", "revenue", "costs", "net_cashflow", "cash")}
+    return {"monthly": series, "summary": {k: _scalar(out[k][0]) for k in SUMMARY_KEYS}}
+
+def monte_carlo(
+    drivers: FinancialDrivers,
+    months: int = FINANCIAL_HORIZON_MONTHS,
+    draws: int = 5000,
+    spread: float = 0.2,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Draws the uncertain drivers log-normally around their base values
+    (sigma = spread) and reports P10/P50/P90 cash by month, summary ranges
+    and the share of draws that run out of cash within the horizon.
+    """
+    _check_months(months)
+    if not 1 <= draws <= FINANCIAL_MAX_DRAWS:
+        raise ValueError(f"draws must be between 1 and {FINANCIAL_MAX_DRAWS}.")
+    if not 0 <= spread <= FINANCIAL_MAX_SPREAD:
+        raise ValueError(f"spread must be between 0 and {FINANCIAL_MAX_SPREAD}.")
+    validate_drivers(_arrays(drivers))
+    rng = np.random.default_rng(seed)
+    d = _arrays(drivers, draws)
+    for name in UNCERTAIN_DRIVERS:
+        d[name] = d[name] * rng.lognormal(0.0, spread, draws)
+    d["churn"] = np.clip(d["churn"], 0.0, 1.0)
+    d["gross_margin"] = np.clip(d["gross_margin"], 0.0, 1.0)
+    # A draw must not push growth out of range: a shrinking budget never reaches -100%
+    d["monthly_growth"] = np.clip(d["monthly_growth"], -0.99, FINANCIAL_MAX_MONTHLY_GROWTH)
+    validate_drivers(d)
+    out = project(d, months)
+
+    cash = np.percentile(out["cash"], [10, 50, 90], axis=0).round(2)
+    summary = {}
+    for key in SUMMARY_KEYS:
+        values = out[key][~np.isnan(out[key])]
+        summary[key] = (
+            dict(zip(("p10", "p50", "p90"), (round(float(v), 4) for v in np.percentile(values, [10, 50, 90]))))
+            if values.size else None
+        )
+        # Share of draws for which the metric exists (e.g. that break even at all)
+        summary[key + "_share"] = round(values.size / draws, 4)
+    return {
+        "draws": draws,
+        "cash": {"p10": cash[0].tolist(), "p50": cash[1].tolist(), "p90": cash[2].tolist()},
+        "summary": summary,
+        "probability_out_of_cash": round(float((out["cash"] < 0).any(axis=1).mean()), 4),
+    }
+
+def sweep(
+    drivers: FinancialDrivers, grid: Dict[str, List[float]], months: int = FINANCIAL_HORIZON_MONTHS
+) -> List[Dict[str, Any]]:
+    """Summary for every combination of the driver values in `grid` (a full factorial sweep)."""
+    _check_months(months)
+    unknown = set(grid) - set(DRIVER_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown drivers in sweep: {sorted(unknown)}")
+    names = list(grid)
+    size = int(np.prod([len(grid[k]) for k in names])) if names else 1
+    if size > FINANCIAL_MAX_SWEEP:
+        raise ValueError(f"Sweep has {size} combinations; the limit is {FINANCIAL_MAX_SWEEP}.")
+
+    combos = list(itertools.product(*(grid[k] for k in names)))
+    d = _arrays(drivers, len(combos))
+    for i, name in enumerate(names):
+        d[name] = np.array([c[i] for c in combos], dtype=float)
+    validate_drivers(d)
+    out = project(d, months)
+    return [
+        {"drivers": dict(zip(names, combo)), **{k: _scalar(out[k][i]) for k in SUMMARY_KEYS}}
+        for i, combo in enumerate(combos)
+    ]
+
+# ==============================================================
+# Headline Figures for the Pack
+# ==============================================================
+
+def _money(value: float) -> str:
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    for unit, scale in (("B", 1e9), ("M", 1e6), ("K", 1e3)):
+        if value >= scale:
+            return f"{sign}${value / scale:.1f}{unit}"
+    return f"{sign}${value:,.0f}"
+
+def headline_figures(drivers: FinancialDrivers, months: int = FINANCIAL_HORIZON_MONTHS) -> Dict[str, str]:
+    """The six Financials text fields, computed from the drivers so they agree with each other."""
+    s = projection(drivers, months)["summary"]
+    return {
+        "total_cost": f"{_money(s['capital_required'])} capital required before cash flow turns positive",
+        "projected_revenue": f"{_money(s['total_revenue'])} over {months} months ({_money(s['arr'])} ARR at month {months})",
+        "roi": f"{s['roi']:.0%} over {months} months" if s["roi"] is not None else "Self-funding from month 1",
+        "burn_rate": f"{_money(s['burn_rate'])}/month while unprofitable",
+        "break_even_month": (
+            f"Month {s['break_even_month']:.0f}" if s["break_even_month"] is not None else f"Not within {months} months"
+        ),
+        "runway": (
+            f"{s['runway_months']:.0f} months on {_money(drivers.initial_capital)}"
+            if s["runway_months"] is not None else f"Beyond {months} months on {_money(drivers.initial_capital)}"
+        ),
+    }
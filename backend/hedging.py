@@ -0,0 +1,88 @@
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from metrics import HEDGES
+
+# ==============================================================
+# Config
+# ==============================================================
+
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "1") == "1"
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+# Never hedge earlier than this, whatever the observed quantile says
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "2.0"))
+
+T = TypeVar("T")
+
+# ==============================================================
+# Latency Tracking
+# ==============================================================
+
+class LatencyTracker:
+    """Rolling window of recent call latencies per key (e.g. per stage)."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, key: str, seconds: float) -> None:
+        self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, key: str, q: float = HEDGE_QUANTILE) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+latency_tracker = LatencyTracker()
+
+# ==============================================================
+# Hedged Calls
+# ==============================================================
+
+async def hedged(key: str, call: Callable[[], Awaitable[T]], tracker: LatencyTracker = latency_tracker) -> T:
+    """
+    Runs call(); if it is still running after the observed p95 for `key`,
+    starts one duplicate and returns whichever succeeds first, cancelling
+    the other. Until HEDGE_MIN_SAMPLES latencies are known, it never hedges.
+    """
+    started: Dict[asyncio.Task, float] = {}
+
+    def launch() -> asyncio.Task:
+        task = asyncio.ensure_future(call())
+        started[task] = time.perf_counter()
+        return task
+
+    primary = launch()
+    threshold = tracker.quantile(key)
+    try:
+        if not LLM_HEDGE_ENABLED or threshold is None:
+            result = await primary
+            tracker.observe(key, time.perf_counter() - started[primary])
+            return result
+
+        done, _ = await asyncio.wait({primary}, timeout=max(threshold, HEDGE_MIN_DELAY_SECONDS))
+        if not done:
+            HEDGES.inc(key, "fired")
+            launch()
+
+        pending = set(started)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    tracker.observe(key, time.perf_counter() - started[task])
+                    if task is not primary:
+                        HEDGES.inc(key, "won")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in started:
+            task.cancel()
@@ -0,0 +1,151 @@
+import os
+import asyncio
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import AsyncSessionLocal
+from crud import build_history_item, search_fields
+from serialization import dumps, extend_object
+from similarity import bucket_rows, INSERT_BUCKETS
+
+# ==============================================================
+# Config
+# ==============================================================
+
+HISTORY_QUEUE_MAX = int(os.getenv("HISTORY_QUEUE_MAX", "1000"))
+HISTORY_FLUSH_BATCH = int(os.getenv("HISTORY_FLUSH_BATCH", "50"))
+HISTORY_FLUSH_INTERVAL_SECONDS = float(os.getenv("HISTORY_FLUSH_INTERVAL_SECONDS", "0.25"))
+HISTORY_WRITE_RETRIES = 3
+
+Record = Tuple[int, str, str, str, str, bytes]  # (user_id, idea, summary, brand_name, competitors_text, pack_json)
+
+# ==============================================================
+# Write-Behind History Persister
+# ==============================================================
+
+class HistoryWriter:
+    """
+    Buffers completed packs in a bounded queue and commits them in batches,
+    either once HISTORY_FLUSH_BATCH records are waiting or after
+    HISTORY_FLUSH_INTERVAL_SECONDS, whichever comes first. submit() only
+    blocks when the queue is full. Readers call wait_for_user() first to
+    see their own pending writes.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = HISTORY_QUEUE_MAX,
+        batch_size: int = HISTORY_FLUSH_BATCH,
+        interval: float = HISTORY_FLUSH_INTERVAL_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: "asyncio.Queue[Record]" = asyncio.Queue(maxsize=max_queue)
+        self._pending_by_user: Counter = Counter()
+        self._write_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"submitted": 0, "written": 0, "batches": 0, "dropped": 0}
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background flusher and drain everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def submit(
+        self,
+        user_id: int,
+        idea: str,
+        startup_pack: Dict[str, Any],
+        pack_json: Optional[bytes] = None,
+        competitor_matrix: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        pack_json lets callers that already serialized the pack hand over those bytes.
+        The competitor matrix is stored inside the pack so it can be regenerated later.
+        """
+        if pack_json is None:
+            pack_json = dumps(startup_pack)
+        if competitor_matrix:
+            pack_json = extend_object(pack_json, competitor_matrix=dumps(competitor_matrix))
+        self._pending_by_user[user_id] += 1
+        self.stats["submitted"] += 1
+        await self._queue.put((
+            user_id, idea, startup_pack.get("startup_summary", ""),
+            *search_fields(startup_pack, competitor_matrix), pack_json,
+        ))
+        self._wakeup.set()
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+
+    async def wait_for_user(self, user_id: int) -> None:
+        """Read-your-writes barrier: commit this user's queued records before a read."""
+        while self._pending_by_user.get(user_id, 0) > 0:
+            await self.flush()
+
+    async def flush(self) -> None:
+        while True:
+            async with self._write_lock:
+                batch = self._take(self.batch_size)
+                if not batch:
+                    return
+                await self._write(batch)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # Give the batch a chance to fill before paying for a commit
+            if self._queue.qsize() < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            self._batch_ready.clear()
+            # Shielded so stop() never abandons a batch already taken off the queue
+            await asyncio.shield(self.flush())
+
+    def _take(self, limit: int) -> List[Record]:
+        batch: List[Record] = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: List[Record]) -> None:
+        for attempt in range(1, HISTORY_WRITE_RETRIES + 1):
+            try:
+                async with AsyncSessionLocal() as db:
+                    items = [build_history_item(*record) for record in batch]
+                    db.add_all(items)
+                    # Ids are needed for the similar-ideas index, written in the same transaction
+                    await db.flush()
+                    buckets = bucket_rows((i.id, i.user_id, i.idea) for i in items)
+                    if buckets:
+                        await db.execute(INSERT_BUCKETS, buckets)
+                    await db.commit()
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+                break
+            except Exception as e:
+                print(f"[HISTORY] Batch write failed (attempt {attempt}/{HISTORY_WRITE_RETRIES}):", e)
+                if attempt == HISTORY_WRITE_RETRIES:
+                    self.stats["dropped"] += len(batch)
+                else:
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+
+        for user_id, *_ in batch:
+            self._pending_by_user[user_id] -= 1
+            if self._pending_by_user[user_id] <= 0:
+                del self._pending_by_user[user_id]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "queued": self._queue.qsize()}
+
+history_writer = HistoryWriter()
@@ -0,0 +1,284 @@
+import os
+import json
+import uuid
+import asyncio
+import datetime
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from database import SessionLocal
+import models
+from history_writer import history_writer
+from response_cache import get_cached_venture_response
+
+# ==============================================================
+# Config
+# ==============================================================
+
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "sqlite")  # sqlite | memory
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+def _job_dict(
+    job_id: str, user_id: Optional[int], idea: str, bypass_cache: bool, mode: Optional[str]
+) -> Dict[str, Any]:
+    return {
+        "id": job_id,
+        "user_id": user_id,
+        "idea": idea,
+        "bypass_cache": bypass_cache,
+        "mode": mode,
+        "status": "queued",
+        "result": None,
+        "error": None,
+        "created_at": _now(),
+        "started_at": None,
+        "finished_at": None,
+    }
+
+# ==============================================================
+# Queue Backends
+# ==============================================================
+
+class JobQueue(ABC):
+    """Storage for jobs. claim() must hand each queued job to exactly one worker."""
+
+    @abstractmethod
+    async def enqueue(self, idea: str, user_id: Optional[int], bypass_cache: bool, mode: Optional[str]) -> str: ...
+
+    @abstractmethod
+    async def claim(self) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    async def complete(self, job_id: str, result: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    async def fail(self, job_id: str, error: str) -> None: ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]: ...
+
+    async def recover(self) -> None:
+        """Requeue jobs left running by a previous process."""
+
+class MemoryJobQueue(JobQueue):
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._queued: List[str] = []
+
+    async def enqueue(self, idea: str, user_id: Optional[int], bypass_cache: bool, mode: Optional[str]) -> str:
+        job_id = uuid.uuid4().hex
+        self._jobs[job_id] = _job_dict(job_id, user_id, idea, bypass_cache, mode)
+        self._queued.append(job_id)
+        return job_id
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        if not self._queued:
+            return None
+        job = self._jobs[self._queued.pop(0)]
+        job.update(status="running", started_at=_now())
+        return dict(job)
+
+    async def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        self._jobs[job_id].update(status="succeeded", result=result, finished_at=_now())
+
+    async def fail(self, job_id: str, error: str) -> None:
+        self._jobs[job_id].update(status="failed", error=error, finished_at=_now())
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+class SQLiteJobQueue(JobQueue):
+    """Jobs persisted in the app database (models.Job), so they survive restarts."""
+
+    def _row_dict(self, row: models.Job) -> Dict[str, Any]:
+        return {
+            "id": row.id,
+            "user_id": row.user_id,
+            "idea": row.idea,
+            "bypass_cache": bool(row.bypass_cache),
+            "mode": row.mode,
+            "status": row.status,
+            "result": json.loads(row.result_json) if row.result_json else None,
+            "error": row.error,
+            "created_at": row.created_at,
+            "started_at": row.started_at,
+            "finished_at": row.finished_at,
+        }
+
+    def _enqueue(self, idea: str, user_id: Optional[int], bypass_cache: bool, mode: Optional[str]) -> str:
+        job_id = uuid.uuid4().hex
+        with SessionLocal() as db:
+            db.add(models.Job(
+                id=job_id, user_id=user_id, idea=idea, bypass_cache=bypass_cache, mode=mode, status="queued"
+            ))
+            db.commit()
+        return job_id
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        with SessionLocal() as db:
+            while True:
+                candidate = (
+                    db.query(models.Job.id)
+                    .filter(models.Job.status == "queued")
+                    .order_by(models.Job.created_at)
+                    .first()
+                )
+                if candidate is None:
+                    return None
+                # Conditional update: only one worker (or process) wins the job
+                claimed = (
+                    db.query(models.Job)
+                    .filter(models.Job.id == candidate.id, models.Job.status == "queued")
+                    .update({"status": "running", "started_at": _now()}, synchronize_session=False)
+                )
+                db.commit()
+                if claimed:
+                    return self._row_dict(db.get(models.Job, candidate.id))
+
+    def _finish(self, job_id: str, **fields: Any) -> None:
+        with SessionLocal() as db:
+            db.query(models.Job).filter(models.Job.id == job_id).update(
+                {**fields, "finished_at": _now()}, synchronize_session=False
+            )
+            db.commit()
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with SessionLocal() as db:
+            row = db.get(models.Job, job_id)
+            return self._row_dict(row) if row else None
+
+    def _recover(self) -> None:
+        with SessionLocal() as db:
+            db.query(models.Job).filter(models.Job.status == "running").update(
+                {"status": "queued", "started_at": None}, synchronize_session=False
+            )
+            db.commit()
+
+    async def enqueue(self, idea: str, user_id: Optional[int], bypass_cache: bool, mode: Optional[str]) -> str:
+        return await asyncio.to_thread(self._enqueue, idea, user_id, bypass_cache, mode)
+
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._claim)
+
+    async def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._finish, job_id, status="succeeded", result_json=json.dumps(result))
+
+    async def fail(self, job_id: str, error: str) -> None:
+        await asyncio.to_thread(self._finish, job_id, status="failed", error=error)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def recover(self) -> None:
+        await asyncio.to_thread(self._recover)
+
+def make_job_queue(backend: str = JOB_QUEUE_BACKEND) -> JobQueue:
+    if backend == "memory":
+        return MemoryJobQueue()
+    if backend == "sqlite":
+        return SQLiteJobQueue()
+    raise ValueError(f"Unknown JOB_QUEUE_BACKEND: {backend}")
+
+# ==============================================================
+# Worker Pool
+# ==============================================================
+
+class JobManager:
+    def __init__(self, queue: JobQueue, workers: int = JOB_WORKERS):
+        self.queue = queue
+        self.workers = workers
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        # job_id -> event set whenever that job changes status
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    async def start(self) -> None:
+        await self.queue.recover()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        print(f"[JOBS] Started {self.workers} workers ({type(self.queue).__name__}).")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(
+        self, idea: str, user_id: Optional[int] = None, bypass_cache: bool = False, mode: Optional[str] = None
+    ) -> str:
+        """mode None runs the job in the server's PIPELINE_MODE."""
+        if not idea or not idea.strip():
+            raise ValueError("Startup idea is empty.")
+        job_id = await self.queue.enqueue(idea, user_id, bypass_cache, mode)
+        self._wakeup.set()
+        return job_id
+
+    def _notify(self, job_id: str) -> None:
+        event = self._changed.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job = await self.queue.claim()
+            if job is None:
+                # Sleep until a submit() wakes us (or poll for jobs from other processes)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._notify(job["id"])
+            try:
+                result = await get_cached_venture_response(
+                    job["idea"], bypass_cache=job["bypass_cache"], mode=job["mode"]
+                )
+                # Persist history only once the job has actually produced a pack
+                if job["user_id"] is not None:
+                    await history_writer.submit(
+                        job["user_id"], job["idea"], result.get("startup_pack", {}),
+                        competitor_matrix=result.get("competitor_matrix"),
+                    )
+                await self.queue.complete(job["id"], result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[JOBS] Job {job['id']} failed:", e)
+                await self.queue.fail(job["id"], str(e))
+            self._notify(job["id"])
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.queue.get(job_id)
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yields the job each time its status changes, ending once it is finished."""
+        last_status = None
+        while True:
+            # Registered before the read so a change in between still wakes us
+            event = self._changed.setdefault(job_id, asyncio.Event())
+            job = await self.queue.get(job_id)
+            if job is None or job["status"] in TERMINAL_STATUSES:
+                # No further _notify() will pop it: drop the event here
+                self._changed.pop(job_id, None)
+            if job is None:
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield job
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            try:
+                await asyncio.wait_for(event.wait(), JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+job_manager = JobManager(make_job_queue())
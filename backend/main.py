@@ -1,25 +1,54 @@
-from typing import Any, Dict, Optional
-import json
+from typing import Any, Dict, List, Literal, Optional
+from contextlib import asynccontextmanager
+import asyncio
 
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
-from jose import jwt
 
-from venture_chain import get_venture_response
-from database import engine, Base, get_db
+from response_cache import get_cached_venture_response, stream_cached_venture_response, response_cache, inflight
+from database import engine, async_engine
 import models
-from routers import auth, history
-from auth_utils import SECRET_KEY, ALGORITHM
+from history_writer import history_writer
+from routers import auth, history, assets, financials, ideas
+from auth_resolver import Principal, get_optional_user, principal_cache
+from password_pool import password_hasher
+from email_service import email_sender
+from migrations import run_migrations
+from clients import clients
+from batch import run_batch, BATCH_MAX_IDEAS
+from jobs import job_manager
+from domains import domain_engine
+from metrics import registry, CONTENT_TYPE_LATEST
+from serialization import dumps, splice_object, FastJSONResponse
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await history_writer.start()
+    await job_manager.start()
+    await email_sender.start()
+    # Registry Bloom index (DOMAIN_INDEX_FILE); cached as <file>.bloom after the first build
+    await asyncio.to_thread(domain_engine.load_index)
+    yield
+    await email_sender.stop()
+    await job_manager.stop()
+    # Drain queued history writes before the engine goes away
+    await history_writer.stop()
+    password_hasher.shutdown()
+    # Close pooled upstream connections
+    await clients.aclose()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="VentureMind.AI Backend",
     description="Backend API for VentureMind.AI startup co-founder chatbot.",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -33,66 +62,206 @@ app.add_middleware(
 # Include routers
 app.include_router(auth.router)
 app.include_router(history.router)
+app.include_router(assets.router)
+app.include_router(financials.router)
+app.include_router(ideas.router)
+
+PipelineMode = Literal["fanout", "compact"]
 
 class ChatRequest(BaseModel):
     message: str
+    bypass_cache: bool = False
+    mode: Optional[PipelineMode] = None  # defaults to PIPELINE_MODE
+
+class BatchRequest(BaseModel):
+    ideas: List[str]
+    concurrency: Optional[int] = None
+    bypass_cache: bool = False
+    mode: Optional[PipelineMode] = None
+
+class JobStatus(BaseModel):
+    id: str
+    status: str
+    idea: str
+    mode: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
 
 class ChatResponse(BaseModel):
     reply_markdown: str
     startup_pack: Dict[str, Any]
     domains: list = []
     competitor_matrix: list = []
+    stage_status: Dict[str, str] = {}  # "ok" | "failed" | "omitted" per stage
 
-def get_optional_user(authorization: Optional[str] = Header(None), db: Session = Depends(get_db)):
-    if not authorization:
-        return None
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != 'bearer':
-            return None
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        user = db.query(models.User).filter(models.User.email == email).first()
-        return user
-    except Exception:
-        return None
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
 
 @app.get("/")
 def read_root():
     return {"status": "ok", "message": "VentureMind.AI backend running."}
 
-@app.post("/api/chat", response_model=ChatResponse)
+@app.get("/metrics")
+def metrics_endpoint():
+    return Response(content=registry.render(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    return {
+        **response_cache.snapshot(),
+        "coalescing": inflight.snapshot(),
+        "history_writer": history_writer.snapshot(),
+        "auth": principal_cache.snapshot(),
+        "password_hasher": password_hasher.snapshot(),
+        "email": email_sender.snapshot(),
+        "domains": domain_engine.snapshot(),
+    }
+
+@app.post("/api/chat", response_model=ChatResponse, response_class=FastJSONResponse)
 async def chat_endpoint(
     payload: ChatRequest, 
-    db: Session = Depends(get_db),
-    user: Optional[models.User] = Depends(get_optional_user)
+    user: Optional[Principal] = Depends(get_optional_user)
 ):
     try:
-        result = await get_venture_response(payload.message)
-        
+        result = await get_cached_venture_response(
+            payload.message, bypass_cache=payload.bypass_cache, mode=payload.mode
+        )
+        startup_pack = result.get("startup_pack", {})
+        competitor_matrix = result.get("competitor_matrix", [])
+        # Serialize the pack once; the same bytes go to history and the response
+        pack_json = dumps(startup_pack)
+
         # Save to history if user is logged in
         if user:
-            startup_pack = result.get("startup_pack", {})
-            summary = startup_pack.get("startup_summary", "")
-            
-            history_item = models.StartupHistory(
-                user_id=user.id,
-                idea=payload.message,
-                summary=summary,
-                full_json=json.dumps(startup_pack)
+            await history_writer.submit(
+                user.id, payload.message, startup_pack, pack_json=pack_json, competitor_matrix=competitor_matrix
             )
-            db.add(history_item)
-            db.commit()
-
-        return ChatResponse(
-            reply_markdown=result["reply_markdown"],
-            startup_pack=result["startup_pack"],
-            domains=result.get("domains", []),
-            competitor_matrix=result.get("competitor_matrix", [])
-        )
+
+        # Pipeline output is already trusted, so ChatResponse is documentation only here
+        return FastJSONResponse(splice_object(
+            reply_markdown=dumps(result["reply_markdown"]),
+            startup_pack=pack_json,
+            domains=dumps(result.get("domains", [])),
+            competitor_matrix=dumps(competitor_matrix),
+            stage_status=dumps(result.get("stage_status", {})),
+        ))
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal error: {e}")
+
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(
+    payload: ChatRequest,
+    user: Optional[Principal] = Depends(get_optional_user)
+):
+    """Server-Sent Events version of /api/chat: one event per pipeline stage, then "done"."""
+    if not payload.message or not payload.message.strip():
+        raise HTTPException(status_code=400, detail="Startup idea is empty.")
+
+    user_id = user.id if user else None
+
+    async def event_stream():
+        try:
+            async for event, data in stream_cached_venture_response(
+                payload.message, bypass_cache=payload.bypass_cache, mode=payload.mode
+            ):
+                if event == "done" and user_id is not None:
+                    await history_writer.submit(
+                        user_id, payload.message, data.get("startup_pack", {}),
+                        competitor_matrix=data.get("competitor_matrix"),
+                    )
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Internal error: {e}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/api/chat/batch")
+async def chat_batch_endpoint(
+    payload: BatchRequest,
+    user: Optional[Principal] = Depends(get_optional_user)
+):
+    """Runs many ideas through the pipeline; streams one NDJSON record per idea as each finishes."""
+    ideas = [i for i in payload.ideas if i and i.strip()]
+    if not ideas:
+        raise HTTPException(status_code=400, detail="No ideas provided.")
+    if len(ideas) > BATCH_MAX_IDEAS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDEAS} ideas per batch.")
+
+    user_id = user.id if user else None
+
+    async def ndjson_stream():
+        async for record in run_batch(ideas, payload.concurrency, payload.bypass_cache, payload.mode):
+            if record["ok"] and user_id is not None:
+                result = record["result"]
+                await history_writer.submit(
+                    user_id, record["idea"], result.get("startup_pack", {}),
+                    competitor_matrix=result.get("competitor_matrix"),
+                )
+            yield dumps(record) + b"\n"
+
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+# ==============================================================
+# Async Job Mode
+# ==============================================================
+
+def _job_status(job: Dict[str, Any]) -> JobStatus:
+    return JobStatus(
+        id=job["id"],
+        status=job["status"],
+        idea=job["idea"],
+        mode=job["mode"],
+        created_at=str(job["created_at"]) if job["created_at"] else None,
+        started_at=str(job["started_at"]) if job["started_at"] else None,
+        finished_at=str(job["finished_at"]) if job["finished_at"] else None,
+        error=job["error"],
+        result=job["result"],
+    )
+
+async def _get_owned_job(job_id: str, user: Optional[Principal]) -> Dict[str, Any]:
+    job = await job_manager.get(job_id)
+    # Jobs submitted while logged in are only visible to their owner
+    if job is None or (job["user_id"] is not None and (user is None or user.id != job["user_id"])):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/api/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(
+    payload: ChatRequest,
+    user: Optional[Principal] = Depends(get_optional_user)
+):
+    try:
+        job_id = await job_manager.submit(
+            payload.message, user.id if user else None, payload.bypass_cache, payload.mode
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return _job_status(await job_manager.get(job_id))
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, user: Optional[Principal] = Depends(get_optional_user)):
+    return _job_status(await _get_owned_job(job_id, user))
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, user: Optional[Principal] = Depends(get_optional_user)):
+    """SSE subscription: one "status" event per status change; the last one carries the result."""
+    await _get_owned_job(job_id, user)
+
+    async def event_stream():
+        async for job in job_manager.subscribe(job_id):
+            yield sse_event("status", _job_status(job).model_dump())
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,162 @@
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# ==============================================================
+# Minimal Prometheus Primitives (text exposition format 0.0.4)
+# ==============================================================
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, lv)} {_fmt(v)}" for lv, v in items
+        ]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labelvalues -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, *labelvalues: str, value: float) -> None:
+        with self._lock:
+            counts, total = self._values.get(labelvalues, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[labelvalues] = (counts, total + value)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            items = sorted((lv, (list(c), s)) for lv, (c, s) in self._values.items())
+        for lv, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, lv, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, lv)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, lv)} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# ==============================================================
+# Pipeline Metrics
+# ==============================================================
+
+STAGE_LATENCY = registry.register(Histogram(
+    "venturemind_stage_latency_seconds", "Wall-clock latency of each pipeline stage.", ["stage"]))
+STAGE_IN_FLIGHT = registry.register(Gauge(
+    "venturemind_stage_in_flight", "Pipeline stages currently running.", ["stage"]))
+STAGE_ERRORS = registry.register(Counter(
+    "venturemind_stage_errors_total", "Pipeline stage failures by exception type.", ["stage", "exception"]))
+PROMPT_TOKENS = registry.register(Counter(
+    "venturemind_llm_prompt_tokens_total", "Prompt tokens sent to the LLM.", ["stage"]))
+COMPLETION_TOKENS = registry.register(Counter(
+    "venturemind_llm_completion_tokens_total", "Completion tokens returned by the LLM.", ["stage"]))
+STAGE_COST = registry.register(Counter(
+    "venturemind_stage_cost_usd_total", "Estimated upstream spend in USD.", ["stage"]))
+HEDGES = registry.register(Counter(
+    "venturemind_llm_hedges_total", "Hedged LLM requests fired, and how many of them won.", ["stage", "outcome"]))
+STAGES_OMITTED = registry.register(Counter(
+    "venturemind_stage_omitted_total", "Optional stages dropped at the request deadline.", ["stage"]))
+DOMAIN_LOOKUPS = registry.register(Counter(
+    "venturemind_domain_lookups_total", "Domain checks by where they were answered.", ["source", "availability"]))
+
+# USD prices; defaults are gpt-4o-mini and Stability Image Core list prices
+LLM_PRICE_INPUT_PER_1M = float(os.getenv("LLM_PRICE_INPUT_PER_1M", "0.15"))
+LLM_PRICE_OUTPUT_PER_1M = float(os.getenv("LLM_PRICE_OUTPUT_PER_1M", "0.60"))
+STABILITY_PRICE_PER_IMAGE = float(os.getenv("STABILITY_PRICE_PER_IMAGE", "0.03"))
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """Records latency, in-flight count and (re-raised) errors for one stage run."""
+    STAGE_IN_FLIGHT.inc(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        STAGE_ERRORS.inc(stage, type(e).__name__)
+        raise
+    finally:
+        STAGE_LATENCY.observe(stage, value=time.perf_counter() - start)
+        STAGE_IN_FLIGHT.dec(stage)
+
+def record_llm_usage(stage: str, prompt_tokens: int, completion_tokens: int) -> None:
+    PROMPT_TOKENS.inc(stage, amount=prompt_tokens)
+    COMPLETION_TOKENS.inc(stage, amount=completion_tokens)
+    STAGE_COST.inc(stage, amount=(
+        prompt_tokens * LLM_PRICE_INPUT_PER_1M + completion_tokens * LLM_PRICE_OUTPUT_PER_1M
+    ) / 1_000_000)
+
+def record_image_generated(stage: str) -> None:
+    STAGE_COST.inc(stage, amount=STABILITY_PRICE_PER_IMAGE)
@@ -0,0 +1,170 @@
+import json
+import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, load_only
+
+import models
+from asset_store import data_url_to_logo_url
+from pack_storage import encode_pack, load_pack
+from crud import search_fields
+from similarity import rebuild_index
+
+# ==============================================================
+# Data Migrations
+# ==============================================================
+# Each migration runs once per database and is recorded in
+# schema_migrations. Append new ones at the end; never reorder.
+
+def _migrate_inline_logos(db: Session) -> None:
+    """Move base64 data: URL logos out of StartupHistory.full_json into the asset store."""
+    rows = (
+        db.query(models.StartupHistory)
+        .options(load_only(models.StartupHistory.id, models.StartupHistory.full_json))
+        .filter(models.StartupHistory.full_json.like('%"data:image/%'))
+        .yield_per(100)
+    )
+    migrated = 0
+    for row in rows:
+        pack = json.loads(row.full_json)
+        brand = pack.get("brand") or {}
+        new_url = data_url_to_logo_url(brand.get("logo_url"))
+        if new_url != brand.get("logo_url"):
+            brand["logo_url"] = new_url
+            row.full_json = json.dumps(pack)
+            migrated += 1
+    db.commit()
+    print(f"[MIGRATIONS] Moved {migrated} inline logos to the asset store.")
+
+def _add_history_listing_index(db: Session) -> None:
+    """Composite (user_id, created_at DESC, id DESC) index for existing databases."""
+    for index in models.StartupHistory.__table__.indexes:
+        if index.name == "ix_startup_history_user_created":
+            index.create(bind=db.connection(), checkfirst=True)
+    db.commit()
+
+def _compress_history_json(db: Session) -> None:
+    """Add full_json_blob and move existing full_json text into it, compressed."""
+    columns = {r[1] for r in db.execute(text("PRAGMA table_info(startup_history)"))}
+    if "full_json_blob" not in columns:
+        db.execute(text("ALTER TABLE startup_history ADD COLUMN full_json_blob BLOB"))
+
+    migrated = 0
+    while True:
+        rows = db.execute(text(
+            "SELECT id, full_json FROM startup_history "
+            "WHERE full_json_blob IS NULL AND full_json IS NOT NULL LIMIT 500"
+        )).all()
+        if not rows:
+            break
+        for row_id, full_json in rows:
+            db.execute(
+                text("UPDATE startup_history SET full_json_blob = :blob, full_json = NULL WHERE id = :id"),
+                {"blob": encode_pack(full_json.encode()), "id": row_id},
+            )
+        db.commit()
+        migrated += len(rows)
+    print(f"[MIGRATIONS] Compressed {migrated} history packs.")
+
+# External-content FTS5 index over startup_history. The content is a view so
+# the index can carry an "owner" token (u<user_id>) that scopes every search
+# to one user inside the FTS query itself. Triggers keep it in sync.
+HISTORY_FTS_DDL = [
+    """CREATE VIEW IF NOT EXISTS history_fts_content AS
+       SELECT id, idea, summary, brand_name, competitors_text, 'u' || user_id AS owner FROM startup_history""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+       idea, summary, brand_name, competitors_text, owner,
+       content='history_fts_content', content_rowid='id',
+       tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS history_fts_ai AFTER INSERT ON startup_history BEGIN
+       INSERT INTO history_fts(rowid, idea, summary, brand_name, competitors_text, owner)
+       VALUES (new.id, new.idea, new.summary, new.brand_name, new.competitors_text, 'u' || new.user_id);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS history_fts_ad AFTER DELETE ON startup_history BEGIN
+       INSERT INTO history_fts(history_fts, rowid, idea, summary, brand_name, competitors_text, owner)
+       VALUES ('delete', old.id, old.idea, old.summary, old.brand_name, old.competitors_text, 'u' || old.user_id);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS history_fts_au
+       AFTER UPDATE OF idea, summary, brand_name, competitors_text, user_id ON startup_history BEGIN
+       INSERT INTO history_fts(history_fts, rowid, idea, summary, brand_name, competitors_text, owner)
+       VALUES ('delete', old.id, old.idea, old.summary, old.brand_name, old.competitors_text, 'u' || old.user_id);
+       INSERT INTO history_fts(rowid, idea, summary, brand_name, competitors_text, owner)
+       VALUES (new.id, new.idea, new.summary, new.brand_name, new.competitors_text, 'u' || new.user_id);
+       END""",
+]
+
+def _add_history_search(db: Session) -> None:
+    """Backfill brand_name/competitors_text from the stored packs, then build the FTS index."""
+    columns = {r[1] for r in db.execute(text("PRAGMA table_info(startup_history)"))}
+    for name, kind in (("brand_name", "VARCHAR"), ("competitors_text", "TEXT")):
+        if name not in columns:
+            db.execute(text(f"ALTER TABLE startup_history ADD COLUMN {name} {kind}"))
+
+    # Before the triggers exist, so these updates are not indexed twice
+    filled, last_id = 0, 0
+    while True:
+        rows = db.execute(text(
+            "SELECT id, full_json_blob, full_json FROM startup_history "
+            "WHERE id > :last AND brand_name IS NULL ORDER BY id LIMIT 500"
+        ), {"last": last_id}).all()
+        if not rows:
+            break
+        for row_id, blob, legacy in rows:
+            brand_name, competitors_text = search_fields(load_pack(blob, legacy))
+            db.execute(
+                text("UPDATE startup_history SET brand_name = :brand, competitors_text = :comp WHERE id = :id"),
+                {"brand": brand_name, "comp": competitors_text, "id": row_id},
+            )
+        db.commit()
+        filled += len(rows)
+        last_id = rows[-1][0]
+
+    for statement in HISTORY_FTS_DDL:
+        db.execute(text(statement))
+    db.execute(text("INSERT INTO history_fts(history_fts) VALUES ('rebuild')"))
+    db.commit()
+    print(f"[MIGRATIONS] Indexed history for search ({filled} rows backfilled).")
+
+def _build_similarity_index(db: Session) -> None:
+    """Index existing history for similar-ideas lookups (idea_lsh is created by create_all)."""
+    indexed = rebuild_index(db)
+    print(f"[MIGRATIONS] Indexed {indexed} history items for similar ideas.")
+
+def _add_job_mode(db: Session) -> None:
+    """Pipeline mode per job, for jobs tables created before it existed."""
+    columns = {r[1] for r in db.execute(text("PRAGMA table_info(jobs)"))}
+    if "mode" not in columns:
+        db.execute(text("ALTER TABLE jobs ADD COLUMN mode VARCHAR"))
+    db.commit()
+
+MIGRATIONS: List[Tuple[str, Callable[[Session], None]]] = [
+    ("0001_inline_logos_to_asset_store", _migrate_inline_logos),
+    ("0002_history_listing_index", _add_history_listing_index),
+    ("0003_compress_history_json", _compress_history_json),
+    ("0004_history_search", _add_history_search),
+    ("0005_similar_ideas_index", _build_similarity_index),
+    ("0006_job_mode", _add_job_mode),
+    # Signatures now cover the idea only, so every stored bucket key changed
+    ("0007_similar_ideas_by_idea", _build_similarity_index),
+]
+
+def run_migrations(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations (name TEXT PRIMARY KEY, applied_at TEXT NOT NULL)"
+        ))
+        applied = {r[0] for r in conn.execute(text("SELECT name FROM schema_migrations"))}
+
+    for name, migrate in MIGRATIONS:
+        if name in applied:
+            continue
+        print(f"[MIGRATIONS] Applying {name}...")
+        with Session(engine) as db:
+            migrate(db)
+            db.execute(
+                text("INSERT INTO schema_migrations (name, applied_at) VALUES (:name, :at)"),
+                {"name": name, "at": datetime.datetime.utcnow().isoformat()},
+            )
+            db.commit()
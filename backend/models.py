@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Text, ForeignKey, DateTime, Boolean, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from database import Base
 import datetime
@@ -27,7 +27,57 @@ class StartupHistory(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     idea = Column(Text)
     summary = Column(Text)
-    full_json = Column(Text)  # Stores the entire StartupPack as JSON
+    full_json = Column(Text, nullable=True)  # Legacy uncompressed StartupPack JSON (pre-0003 rows)
+    full_json_blob = Column(LargeBinary, nullable=True)  # Compressed StartupPack JSON, see pack_storage
+    # Copied out of the compressed pack so the history_fts index can read them (see migrations 0004)
+    brand_name = Column(String, nullable=True)
+    competitors_text = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     owner = relationship("User", back_populates="history")
+
+    __table_args__ = (
+        # Serves the per-user, newest-first keyset pagination in routers/history.py
+        Index("ix_startup_history_user_created", user_id, created_at.desc(), id.desc()),
+    )
+
+
+class IdeaBucket(Base):
+    """One LSH band bucket of a history item's MinHash signature (see similarity.py)."""
+    __tablename__ = "idea_lsh"
+
+    bucket = Column(BigInteger, primary_key=True, autoincrement=False)
+    history_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    __table_args__ = {"sqlite_with_rowid": False}
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    idea = Column(Text)
+    bypass_cache = Column(Boolean, default=False)
+    mode = Column(String, nullable=True)  # pipeline mode; None = PIPELINE_MODE
+    status = Column(String, index=True, default="queued")  # queued | running | succeeded | failed
+    result_json = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class OutboundEmail(Base):
+    __tablename__ = "outbound_emails"
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String)
+    subject = Column(String)
+    body_html = Column(Text)
+    status = Column(String, index=True, default="queued")  # queued | sending | sent | failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
@@ -0,0 +1,130 @@
+import os
+import zlib
+import struct
+from typing import Any, Dict, List, Optional
+
+from serialization import loads
+
+# ==============================================================
+# Compressed Pack Format
+# ==============================================================
+# StartupHistory.full_json_blob layout (v1):
+#
+#   1 byte   format version (0x01)
+#   4 bytes  crc32 of the uncompressed JSON (little-endian)
+#   4 bytes  length of the uncompressed JSON (little-endian)
+#   ...      raw deflate stream, ended with Z_SYNC_FLUSH instead of Z_FINISH
+#
+# Ending on a sync flush leaves the stream byte-aligned with no final block,
+# so it can be spliced between other deflate blocks and framed as gzip
+# without ever being decompressed (see gzip_frame).
+
+PACK_FORMAT_V1 = 1
+PACK_COMPRESSION_LEVEL = int(os.getenv("PACK_COMPRESSION_LEVEL", "6"))
+
+_HEADER = struct.Struct("<BII")
+
+def encode_pack(json_bytes: bytes) -> bytes:
+    comp = zlib.compressobj(PACK_COMPRESSION_LEVEL, zlib.DEFLATED, -15)
+    body = comp.compress(json_bytes) + comp.flush(zlib.Z_SYNC_FLUSH)
+    return _HEADER.pack(PACK_FORMAT_V1, zlib.crc32(json_bytes), len(json_bytes)) + body
+
+def decode_pack(blob: bytes) -> bytes:
+    version, _, _ = _HEADER.unpack_from(blob)
+    if version != PACK_FORMAT_V1:
+        raise ValueError(f"Unknown pack format version: {version}")
+    decomp = zlib.decompressobj(-15)
+    return decomp.decompress(blob[_HEADER.size:]) + decomp.flush()
+
+def stored_pack_json(blob: Optional[bytes], legacy_text: Optional[str]) -> bytes:
+    """JSON bytes for a history row, falling back to the pre-compression text column."""
+    if blob is not None:
+        return decode_pack(blob)
+    return (legacy_text or "{}").encode()
+
+def load_pack(blob: Optional[bytes], legacy_text: Optional[str]) -> Dict[str, Any]:
+    return loads(stored_pack_json(blob, legacy_text))
+
+# ==============================================================
+# gzip Passthrough
+# ==============================================================
+
+def _gf2_times(mat: List[int], vec: int) -> int:
+    total, i = 0, 0
+    while vec:
+        if vec & 1:
+            total ^= mat[i]
+        vec >>= 1
+        i += 1
+    return total
+
+def _gf2_square(mat: List[int]) -> List[int]:
+    return [_gf2_times(mat, mat[n]) for n in range(32)]
+
+def _zero_byte_operators() -> List[List[int]]:
+    # Operator for one zero bit, squared three times -> one zero byte,
+    # then _OPS[k] appends 2**k zero bytes to a CRC.
+    op = [0xEDB88320] + [1 << n for n in range(31)]
+    for _ in range(3):
+        op = _gf2_square(op)
+    ops = [op]
+    for _ in range(32):
+        ops.append(_gf2_square(ops[-1]))
+    return ops
+
+_OPS = _zero_byte_operators()
+
+def crc32_combine(crc1: int, crc2: int, len2: int) -> int:
+    """crc32(a + b) from crc32(a), crc32(b) and len(b), as zlib's crc32_combine."""
+    k = 0
+    while len2:
+        if len2 & 1:
+            crc1 = _gf2_times(_OPS[k], crc1)
+        len2 >>= 1
+        k += 1
+    return crc1 ^ crc2
+
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+def gzip_frame(prefix: bytes, blob: bytes, suffix: bytes) -> bytes:
+    """gzip body for prefix + <stored JSON> + suffix, reusing the stored deflate bytes as-is."""
+    version, body_crc, body_len = _HEADER.unpack_from(blob)
+    if version != PACK_FORMAT_V1:
+        raise ValueError(f"Unknown pack format version: {version}")
+
+    head = zlib.compressobj(PACK_COMPRESSION_LEVEL, zlib.DEFLATED, -15)
+    tail = zlib.compressobj(PACK_COMPRESSION_LEVEL, zlib.DEFLATED, -15)
+    crc = crc32_combine(zlib.crc32(prefix), body_crc, body_len)
+    crc = zlib.crc32(suffix, crc)
+    size = (len(prefix) + body_len + len(suffix)) & 0xFFFFFFFF
+
+    return b"".join((
+        _GZIP_HEADER,
+        head.compress(prefix) + head.flush(zlib.Z_SYNC_FLUSH),
+        memoryview(blob)[_HEADER.size:],
+        tail.compress(suffix) + tail.flush(zlib.Z_FINISH),
+        struct.pack("<II", crc, size),
+    ))
+
+def _qvalue(params: str) -> float:
+    """q from a coding's parameters; missing or malformed values count as 1."""
+    for param in params.split(";"):
+        name, _, value = param.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 1.0
+    return 1.0
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """An explicit gzip entry decides; "*" only applies when gzip is not listed."""
+    wildcard = None
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if coding == "gzip":
+            return _qvalue(params) > 0
+        if coding == "*" and wildcard is None:
+            wildcard = _qvalue(params) > 0
+    return bool(wildcard)
@@ -0,0 +1,135 @@
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# ==============================================================
+# Declarative Stage Graph
+# ==============================================================
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One node of the pipeline. `func` is called with keyword arguments named
+    after `requires` and starts as soon as all of them exist. If the run is
+    speculative and `speculative_requires` is set, the stage starts once that
+    smaller set exists instead; the missing inputs are passed as None.
+    Optional stages are dropped once the run's budget is spent.
+    """
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    requires: Tuple[str, ...]
+    speculative_requires: Optional[Tuple[str, ...]] = None
+    optional: bool = False
+
+def stage_state(stage_optional: bool, value: Any) -> str:
+    """
+    Optional stages report failure by returning None instead of raising, so
+    that counts as "failed". An empty list or dict is a valid result ("ok").
+    """
+    return "failed" if stage_optional and value is None else "ok"
+
+def _ready(needs: Tuple[str, ...], values: Dict[str, Any]) -> bool:
+    return all(n in values for n in needs)
+
+def validate_graph(stages: List[Stage], inputs: Tuple[str, ...]) -> None:
+    known = set(inputs)
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate stage names in pipeline.")
+    provided = known | set(names)
+    for s in stages:
+        missing = [r for r in s.requires if r not in provided]
+        if missing:
+            raise ValueError(f"Stage '{s.name}' requires unknown inputs: {missing}")
+    optional = {s.name for s in stages if s.optional}
+    for s in stages:
+        if not s.optional and optional.intersection(s.requires):
+            raise ValueError(f"Required stage '{s.name}' cannot depend on optional stages.")
+
+async def run_graph(
+    stages: List[Stage],
+    inputs: Dict[str, Any],
+    speculate: bool = False,
+    timings: Optional[Dict[str, Dict[str, Any]]] = None,
+    budget_seconds: Optional[float] = None,
+    status: Optional[Dict[str, str]] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Runs every stage the moment its inputs exist and yields (stage, value)
+    in completion order. Per-stage start/end offsets (ms from run start)
+    are recorded into `timings` if given.
+
+    With `budget_seconds`, optional stages still running (or not yet
+    started) when the budget runs out are cancelled and never yielded;
+    required stages always run to completion. `status` receives "ok",
+    "failed" (see stage_state) or "omitted" per stage.
+    """
+    validate_graph(stages, tuple(inputs))
+    values: Dict[str, Any] = dict(inputs)
+    waiting = list(stages)
+    running: Dict[asyncio.Task, Stage] = {}
+    t0 = time.perf_counter()
+    deadline = t0 + budget_seconds if budget_seconds else None
+    expired = False
+
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - t0) * 1000, 1)
+
+    def omit(stage: Stage) -> None:
+        if status is not None:
+            status[stage.name] = "omitted"
+
+    try:
+        while waiting or running:
+            if expired:
+                for stage in [s for s in waiting if s.optional]:
+                    waiting.remove(stage)
+                    omit(stage)
+
+            for stage in list(waiting):
+                needs = stage.requires
+                speculative = False
+                if not _ready(needs, values) and speculate and stage.speculative_requires:
+                    needs = stage.speculative_requires
+                    speculative = True
+                if not _ready(needs, values):
+                    continue
+
+                waiting.remove(stage)
+                kwargs = {r: values.get(r) for r in stage.requires}
+                running[asyncio.create_task(stage.func(**kwargs))] = stage
+                if timings is not None:
+                    timings[stage.name] = {"start_ms": elapsed_ms(), "speculative": speculative}
+
+            if not running:
+                if not waiting:
+                    break
+                raise RuntimeError(f"Pipeline stalled; unreachable stages: {[s.name for s in waiting]}")
+
+            timeout = None if deadline is None or expired else max(0.0, deadline - time.perf_counter())
+            done, _ = await asyncio.wait(running.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Budget spent: drop optional work, keep waiting on required stages
+                expired = True
+                for task, stage in list(running.items()):
+                    if stage.optional:
+                        task.cancel()
+                        del running[task]
+                        omit(stage)
+                        if timings is not None:
+                            timings[stage.name]["end_ms"] = elapsed_ms()
+                continue
+
+            for task in done:
+                stage = running.pop(task)
+                if timings is not None:
+                    timings[stage.name]["end_ms"] = elapsed_ms()
+                value = task.result()
+                values[stage.name] = value
+                if status is not None:
+                    status[stage.name] = stage_state(stage.optional, value)
+                yield stage.name, value
+    finally:
+        for task in running:
+            task.cancel()
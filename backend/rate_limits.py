@@ -0,0 +1,84 @@
+import os
+import time
+import asyncio
+from typing import Dict, Optional
+
+# ==============================================================
+# Config (0 = unlimited)
+# ==============================================================
+
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "0"))
+OPENAI_TPM = float(os.getenv("OPENAI_TPM", "0"))
+STABILITY_RPM = float(os.getenv("STABILITY_RPM", "0"))
+
+# Rough completion size reserved per structured call until real usage is known
+COMPLETION_TOKEN_ALLOWANCE = int(os.getenv("COMPLETION_TOKEN_ALLOWANCE", "1200"))
+
+# ==============================================================
+# Token Bucket
+# ==============================================================
+
+class TokenBucket:
+    """Refills continuously at rate_per_minute up to capacity (one minute's worth by default)."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # A single request larger than the bucket would never fit; let it drain the bucket instead
+        amount = min(amount, self.capacity)
+        # The lock keeps waiters in FIFO order so large requests are not starved
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate_per_second)
+
+    def adjust(self, delta: float) -> None:
+        """Debit (positive) or credit (negative) tokens after the fact; may go below zero."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+class ProviderLimiter:
+    """Requests-per-minute and tokens-per-minute budget for one upstream provider."""
+
+    def __init__(self, rpm: float = 0, tpm: float = 0):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.waited_seconds = 0.0
+
+    async def acquire(self, estimated_tokens: int = 0) -> None:
+        start = time.monotonic()
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None and estimated_tokens:
+            await self.tokens.acquire(estimated_tokens)
+        self.waited_seconds += time.monotonic() - start
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Correct the token bucket once the provider reports real usage."""
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+_limiters: Dict[str, ProviderLimiter] = {
+    "openai": ProviderLimiter(OPENAI_RPM, OPENAI_TPM),
+    "stability": ProviderLimiter(STABILITY_RPM),
+}
+
+def rate_limiter(provider: str) -> ProviderLimiter:
+    return _limiters[provider]
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prompts
+    return len(text) // 4 + COMPLETION_TOKEN_ALLOWANCE
@@ -0,0 +1,294 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from venture_chain import stream_venture_response, PIPELINE_MODE, PIPELINE_MODES
+from singleflight import SingleFlight
+from serialization import dumps, loads
+
+# ==============================================================
+# Config
+# ==============================================================
+
+CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", str(60 * 60 * 24)))
+CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_DB_PATH = os.getenv("RESPONSE_CACHE_DB_PATH", "./venturemind_cache.db")
+CACHE_DB_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_DB_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# ==============================================================
+# Idea Normalization
+# ==============================================================
+
+_FILLER_WORDS = {"a", "an", "the"}
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+def normalize_idea(idea: str) -> str:
+    """Collapse trivial rewordings (case, punctuation, spacing, articles) to one form."""
+    text = unicodedata.normalize("NFKC", idea or "").lower()
+    text = _PUNCT_RE.sub(" ", text)
+    words = [w for w in _SPACE_RE.split(text) if w and w not in _FILLER_WORDS]
+    return " ".join(words)
+
+def cache_key(idea: str, **options: Any) -> str:
+    raw = normalize_idea(idea)
+    if options:
+        raw += "|" + json.dumps(options, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+# ==============================================================
+# Two-Tier Cache (in-memory LRU + SQLite)
+# ==============================================================
+
+class ResponseCache:
+    def __init__(
+        self,
+        db_path: Optional[str] = CACHE_DB_PATH,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        db_max_bytes: int = CACHE_DB_MAX_BYTES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.db_max_bytes = db_max_bytes
+
+        # key -> (expires_at, payload)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_response_cache_last_access ON response_cache (last_access)"
+            )
+            self._db.commit()
+
+    # --- memory tier ---
+
+    def _memory_get(self, key: str, now: float) -> Optional[bytes]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= now:
+                self._memory_pop(key)
+                self.stats["expirations"] += 1
+                return None
+            self._memory.move_to_end(key)
+            return payload
+
+    def _memory_set(self, key: str, payload: bytes, expires_at: float) -> None:
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory_pop(key)
+            self._memory[key] = (expires_at, payload)
+            self._memory_bytes += size
+            while self._memory and (
+                len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._memory))
+                self._memory_pop(oldest)
+                self.stats["evictions"] += 1
+
+    def _memory_pop(self, key: str) -> None:
+        _, payload = self._memory.pop(key)
+        self._memory_bytes -= len(payload)
+
+    # --- SQLite tier (blocking; called via asyncio.to_thread) ---
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT payload, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, expires_at = row
+            if expires_at <= now:
+                self._db.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._db.commit()
+                self.stats["expirations"] += 1
+                return None
+            self._db.execute(
+                "UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+            return payload, expires_at
+
+    def _disk_set(self, key: str, payload: bytes, expires_at: float, now: float) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO response_cache (key, payload, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), expires_at, now),
+            )
+            self._db.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+            while total > self.db_max_bytes:
+                row = self._db.execute(
+                    "SELECT key, size FROM response_cache ORDER BY last_access LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._db.execute("DELETE FROM response_cache WHERE key = ?", (row[0],))
+                total -= row[1]
+                self.stats["evictions"] += 1
+            self._db.commit()
+
+    # --- public API ---
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        payload = self._memory_get(key, now)
+        if payload is not None:
+            self.stats["memory_hits"] += 1
+            return loads(payload)
+
+        found = await asyncio.to_thread(self._disk_get, key, now)
+        if found is not None:
+            payload, expires_at = found
+            self._memory_set(key, payload, expires_at)
+            self.stats["disk_hits"] += 1
+            return loads(payload)
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        payload = dumps(value)
+        self._memory_set(key, payload, expires_at)
+        await asyncio.to_thread(self._disk_set, key, payload, expires_at, now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM response_cache")
+                self._db.commit()
+
+    def snapshot(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+        }
+
+response_cache = ResponseCache()
+
+# ==============================================================
+# Cached + Coalesced Orchestrator
+# ==============================================================
+
+# Concurrent misses for the same key share one pipeline run
+inflight = SingleFlight()
+
+async def _lookup(key: str, bypass_cache: bool) -> Optional[Dict[str, Any]]:
+    if bypass_cache:
+        response_cache.stats["bypasses"] += 1
+        return None
+    return await response_cache.get(key)
+
+def _resolve_mode(idea: str, mode: Optional[str]) -> Tuple[str, str]:
+    """(mode, cache key). Fan-out keys carry no mode so entries from before compact mode stay valid."""
+    if not idea or not idea.strip():
+        raise ValueError("Startup idea is empty.")
+    mode = mode or PIPELINE_MODE
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode: {mode}")
+    return mode, cache_key(idea) if mode == "fanout" else cache_key(idea, mode=mode)
+
+async def _run_and_store(idea: str, key: str, mode: str) -> AsyncIterator[Tuple[str, Any]]:
+    async for event, data in stream_venture_response(idea, mode=mode):
+        # Packs with stages omitted at the deadline or failed are served but not cached
+        if event == "done" and not {"omitted", "failed"} & set(data.get("stage_status", {}).values()):
+            await response_cache.set(key, data)
+        yield event, data
+
+def _shared_run(idea: str, key: str, mode: str) -> AsyncIterator[Tuple[str, Any]]:
+    return inflight.stream(key, lambda: _run_and_store(idea, key, mode))
+
+async def get_cached_venture_response(
+    idea: str, bypass_cache: bool = False, mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """get_venture_response behind the response cache. bypass_cache forces a fresh run (and refreshes the entry)."""
+    mode, key = _resolve_mode(idea, mode)
+    cached = await _lookup(key, bypass_cache)
+    if cached is not None:
+        print("[CACHE] Hit for idea.")
+        return cached
+
+    result: Dict[str, Any] = {}
+    async for event, data in _shared_run(idea, key, mode):
+        if event == "done":
+            result = data
+    return result
+
+async def stream_cached_venture_response(
+    idea: str, bypass_cache: bool = False, mode: Optional[str] = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming variant: a cache hit replays the stage events from the stored result."""
+    mode, key = _resolve_mode(idea, mode)
+    cached = await _lookup(key, bypass_cache)
+    if cached is not None:
+        print("[CACHE] Hit for idea (stream).")
+        pack = cached["startup_pack"]
+        yield "startup_pack", pack
+        yield "real_world_scenario", pack.get("real_world_scenario")
+        yield "competitor_matrix", cached.get("competitor_matrix", [])
+        yield "logo_url", (pack.get("brand") or {}).get("logo_url")
+        yield "domains", cached.get("domains", [])
+        yield "done", cached
+        return
+
+    async for event, data in _shared_run(idea, key, mode):
+        yield event, data
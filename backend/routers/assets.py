@@ -0,0 +1,26 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import FileResponse
+
+from asset_store import logo_path
+
+router = APIRouter(prefix="/assets", tags=["assets"])
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@router.get("/logos/{digest}")
+def get_logo(digest: str, if_none_match: Optional[str] = Header(None)):
+    path = logo_path(digest)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Logo not found")
+
+    # Content-addressed: the digest itself is a strong validator
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+
+    if if_none_match:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers=headers)
+
+    return FileResponse(path, media_type="image/png", headers=headers)
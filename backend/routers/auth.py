@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from datetime import timedelta
 
-from database import get_db
+from database import get_async_db
 import models
-from auth_utils import verify_password, get_password_hash, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from email_service import send_welcome_email
+from auth_utils import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from password_pool import password_hasher, PasswordHasherBusy, PASSWORD_HASH_RETRY_AFTER_SECONDS
+from email_service import welcome_email, email_sender
 
 router = APIRouter(
     prefix="/auth",
@@ -30,13 +32,26 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly.",
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+async def _get_user_by_email(db: AsyncSession, email: str):
+    return (await db.execute(select(models.User).where(models.User.email == email))).scalars().first()
+
 @router.post("/signup")
-def signup(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await _get_user_by_email(db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusy:
+        raise _busy()
     new_user = models.User(
         email=user.email, 
         hashed_password=hashed_password,
@@ -45,23 +60,36 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
         phone=user.phone
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    # Send Welcome Email
-    send_welcome_email(new_user.email)
+    # Welcome Email goes to the outbox in the same transaction; email_sender delivers it
+    db.add(welcome_email(new_user.email))
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent signup for the same email
+        raise HTTPException(status_code=400, detail="Email already registered")
+    email_sender.wake()
 
     return {"message": "User created successfully. Please check your email and log in."}
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(user_data: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == user_data.email).first()
-    if not user or not verify_password(user_data.password, user.hashed_password):
+async def login_for_access_token(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await _get_user_by_email(db, user_data.email)
+    valid = False
+    if user:
+        try:
+            valid, new_hash = await password_hasher.verify_and_update(user_data.password, user.hashed_password)
+        except PasswordHasherBusy:
+            raise _busy()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Stored hash predates the current ARGON2_* settings
+        user.hashed_password = new_hash
+        await db.commit()
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -0,0 +1,39 @@
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from financials import (
+    FinancialDrivers, projection, monte_carlo, sweep, headline_figures, FINANCIAL_HORIZON_MONTHS,
+)
+
+router = APIRouter(prefix="/api/financials", tags=["financials"])
+
+class SimulateRequest(BaseModel):
+    drivers: FinancialDrivers
+    months: int = FINANCIAL_HORIZON_MONTHS
+    draws: int = 0                              # > 0 adds a Monte Carlo range
+    spread: float = 0.2                         # log-normal sigma for the uncertain drivers
+    seed: Optional[int] = None
+    sweep: Optional[Dict[str, List[float]]] = None  # driver -> values, every combination is run
+
+class SimulateResponse(BaseModel):
+    financials: Dict[str, str]
+    projection: Dict[str, Any]
+    monte_carlo: Optional[Dict[str, Any]] = None
+    sweep: Optional[List[Dict[str, Any]]] = None
+
+@router.post("/simulate", response_model=SimulateResponse)
+def simulate(payload: SimulateRequest):
+    """Recomputes a pack's financials from edited drivers; no LLM call is involved."""
+    try:
+        return SimulateResponse(
+            financials=headline_figures(payload.drivers, payload.months),
+            projection=projection(payload.drivers, payload.months),
+            monte_carlo=(
+                monte_carlo(payload.drivers, payload.months, payload.draws, payload.spread, payload.seed)
+                if payload.draws > 0 else None
+            ),
+            sweep=sweep(payload.drivers, payload.sweep, payload.months) if payload.sweep else None,
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
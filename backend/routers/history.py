@@ -1,17 +1,32 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, or_, and_, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from jose import JWTError, jwt
+import os
+import re
+import html
 import json
+import base64
+import datetime
 
-from database import get_db
-from models import StartupHistory, User
-from auth_utils import SECRET_KEY, ALGORITHM
+from database import get_async_db
+from models import StartupHistory
+from auth_resolver import Principal, get_current_user
+from history_writer import history_writer
+from pack_storage import accepts_gzip, gzip_frame, stored_pack_json, load_pack, encode_pack
+from serialization import dumps, extend_object, FastJSONResponse
+from venture_chain import StartupPack, regenerate_sections
+from crud import search_fields
 
 router = APIRouter(prefix="/history", tags=["history"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "50"))
+HISTORY_PAGE_MAX = int(os.getenv("HISTORY_PAGE_MAX", "200"))
+HISTORY_SEARCH_PAGE_SIZE = int(os.getenv("HISTORY_SEARCH_PAGE_SIZE", "20"))
+HISTORY_SEARCH_MAX_TERMS = 16
+# bm25 ranks only the newest N matches; older ones follow by date (0 = rank all)
+HISTORY_SEARCH_RANK_WINDOW = int(os.getenv("HISTORY_SEARCH_RANK_WINDOW", "1000"))
 
 class HistoryItem(BaseModel):
     id: int
@@ -22,6 +37,10 @@ class HistoryItem(BaseModel):
     class Config:
         orm_mode = True
 
+class HistoryPage(BaseModel):
+    items: List[HistoryItem]
+    next_cursor: Optional[str] = None
+
 class HistoryDetail(BaseModel):
     id: int
     idea: str
@@ -31,39 +50,247 @@ class HistoryDetail(BaseModel):
     class Config:
         orm_mode = True
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+class HistorySearchHit(BaseModel):
+    id: int
+    idea: str
+    summary: Optional[str] = None
+    brand_name: Optional[str] = None
+    created_at: str
+    idea_html: str      # idea with matches wrapped in <mark>, HTML-escaped
+    snippet_html: str   # best-matching excerpt of summary / brand / competitors
+
+class HistorySearchPage(BaseModel):
+    items: List[HistorySearchHit]
+    next_offset: Optional[int] = None
+
+Section = Literal["brand", "logo", "financials", "pitch", "real_world_scenario", "competitor_matrix"]
+
+class RegenerateRequest(BaseModel):
+    sections: List[Section]
+    instructions: Optional[str] = None  # e.g. "shorter, more playful brand name"
+
+class RegenerateResponse(BaseModel):
+    id: int
+    reply_markdown: str
+    startup_pack: Dict[str, Any]
+    competitor_matrix: List[Dict[str, Any]] = []
+    stage_status: Dict[str, str] = {}
+
+# ==============================================================
+# Keyset Cursor: opaque base64 of "<created_at iso>|<id>"
+# ==============================================================
+
+def encode_cursor(created_at: datetime.datetime, item_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, int]:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
-    return user
-
-@router.get("/", response_model=List[HistoryItem])
-def get_user_history(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return db.query(StartupHistory).filter(StartupHistory.user_id == current_user.id).order_by(StartupHistory.created_at.desc()).all()
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, item_id = raw.split("|")
+        return datetime.datetime.fromisoformat(created_at), int(item_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/", response_model=HistoryPage)
+async def get_user_history(
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_PAGE_MAX),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Read-your-writes: commit this user's queued packs before listing
+    await history_writer.wait_for_user(current_user.id)
+
+    # Projection only: full_json is never read for the listing
+    query = (
+        select(StartupHistory.id, StartupHistory.idea, StartupHistory.summary, StartupHistory.created_at)
+        .where(StartupHistory.user_id == current_user.id)
+        .order_by(StartupHistory.created_at.desc(), StartupHistory.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        query = query.where(or_(
+            StartupHistory.created_at < created_at,
+            and_(StartupHistory.created_at == created_at, StartupHistory.id < item_id),
+        ))
+
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return HistoryPage(
+        items=[
+            HistoryItem(id=r.id, idea=r.idea, summary=r.summary, created_at=str(r.created_at))
+            for r in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+# ==============================================================
+# Full-Text Search (history_fts, see migrations 0004)
+# ==============================================================
+
+# Control characters as match markers, so the text can be HTML-escaped before <mark> goes in
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+# Ranking reads every match's column sizes, so a broad query over a long
+# history is ranked within its newest matches: the rowid of the Nth newest
+# match becomes a floor that FTS5 applies as a range on its doclists.
+# Matches below the floor still page in, after the ranked ones, newest first.
+_RANK_WINDOW_SQL = text("""
+    SELECT min(rowid), count(*) FROM (
+        SELECT rowid FROM history_fts WHERE history_fts MATCH :query
+        ORDER BY rowid DESC LIMIT :window
+    )
+""")
+_HIT_COLUMNS = """
+    SELECT h.id, h.idea, h.summary, h.brand_name, h.created_at,
+           highlight(history_fts, 0, char(2), char(3)) AS idea_hl,
+           snippet(history_fts, 1, char(2), char(3), '…', 16) AS summary_snip,
+           snippet(history_fts, 2, char(2), char(3), '…', 16) AS brand_snip,
+           snippet(history_fts, 3, char(2), char(3), '…', 16) AS competitors_snip
+    FROM history_fts JOIN startup_history h ON h.id = history_fts.rowid
+"""
+# bm25 column weights: idea, summary, brand_name, competitors_text, owner
+_SEARCH_SQL = text(_HIT_COLUMNS + """
+    WHERE history_fts MATCH :query AND history_fts.rowid >= :floor
+    ORDER BY bm25(history_fts, 4.0, 2.0, 3.0, 1.0, 0.0)
+    LIMIT :limit OFFSET :offset
+""")
+_OLDER_SQL = text(_HIT_COLUMNS + """
+    WHERE history_fts MATCH :query AND history_fts.rowid < :floor
+    ORDER BY history_fts.rowid DESC
+    LIMIT :limit OFFSET :offset
+""")
+
+def fts_query(q: str, user_id: int) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text: every word must match (the last one
+    as a prefix, for type-ahead) in the text columns of this user's rows.
+    Words are quoted, so FTS5 operators in the input are searched literally.
+    """
+    terms = re.findall(r"\w+", q.lower())[:HISTORY_SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    phrases = " ".join(f'"{t}"' for t in terms) + "*"
+    return f"owner:u{user_id} AND {{idea summary brand_name competitors_text}} : ({phrases})"
+
+def _marked_html(value: Optional[str]) -> str:
+    return html.escape(value or "").replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+@router.get("/search", response_model=HistorySearchPage)
+async def search_user_history(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(HISTORY_SEARCH_PAGE_SIZE, ge=1, le=HISTORY_PAGE_MAX),
+    offset: int = Query(0, ge=0),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    The caller's items matching `q`. The newest HISTORY_SEARCH_RANK_WINDOW
+    matches come first, best match first; any older matches follow, newest first.
+    """
+    await history_writer.wait_for_user(current_user.id)
+    query = fts_query(q, current_user.id)
+    if query is None:
+        return HistorySearchPage(items=[])
+
+    floor, ranked = 0, None
+    if HISTORY_SEARCH_RANK_WINDOW > 0:
+        floor, ranked = (await db.execute(
+            _RANK_WINDOW_SQL, {"query": query, "window": HISTORY_SEARCH_RANK_WINDOW}
+        )).one()
+        floor = floor or 0
+    rows = []
+    if ranked is None or offset < ranked:
+        rows = (await db.execute(
+            _SEARCH_SQL, {"query": query, "floor": floor, "limit": limit + 1, "offset": offset}
+        )).all()
+    # A full window may have older matches behind it; the page continues into them
+    if ranked == HISTORY_SEARCH_RANK_WINDOW and len(rows) <= limit:
+        rows += (await db.execute(_OLDER_SQL, {
+            "query": query, "floor": floor, "limit": limit + 1 - len(rows), "offset": max(0, offset - ranked),
+        })).all()
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+
+    items = []
+    for r in rows:
+        snippets = (r.summary_snip, r.brand_snip, r.competitors_snip)
+        snippet = next((sn for sn in snippets if sn and _MARK_OPEN in sn), r.summary_snip)
+        items.append(HistorySearchHit(
+            id=r.id, idea=r.idea, summary=r.summary, brand_name=r.brand_name, created_at=str(r.created_at),
+            idea_html=_marked_html(r.idea_hl), snippet_html=_marked_html(snippet),
+        ))
+    return HistorySearchPage(items=items, next_offset=next_offset)
 
 @router.get("/{item_id}", response_model=HistoryDetail)
-def get_history_detail(item_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    item = db.query(StartupHistory).filter(StartupHistory.id == item_id, StartupHistory.user_id == current_user.id).first()
+async def get_history_detail(
+    item_id: int,
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    await history_writer.wait_for_user(current_user.id)
+    item = (await db.execute(
+        select(
+            StartupHistory.id, StartupHistory.idea, StartupHistory.created_at,
+            StartupHistory.full_json_blob, StartupHistory.full_json,
+        ).where(StartupHistory.id == item_id, StartupHistory.user_id == current_user.id)
+    )).first()
     if not item:
         raise HTTPException(status_code=404, detail="History item not found")
-    
-    # Parse the JSON string back to dict
-    return {
-        "id": item.id,
-        "idea": item.idea,
-        "full_json": json.loads(item.full_json),
-        "created_at": str(item.created_at)
-    }
+
+    # The stored pack is spliced into the response as-is; it is never parsed
+    prefix = b'{"id":%d,"idea":%s,"created_at":%s,"full_json":' % (
+        item.id, json.dumps(item.idea).encode(), json.dumps(str(item.created_at)).encode()
+    )
+    headers = {"Vary": "Accept-Encoding"}
+    if item.full_json_blob is not None and accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_frame(prefix, item.full_json_blob, b"}")
+    else:
+        body = prefix + stored_pack_json(item.full_json_blob, item.full_json) + b"}"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.post("/{item_id}/regenerate", response_model=RegenerateResponse, response_class=FastJSONResponse)
+async def regenerate_history_sections(
+    item_id: int,
+    payload: RegenerateRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Re-runs only the requested sections of a stored pack and saves the result in place."""
+    await history_writer.wait_for_user(current_user.id)
+    item = (await db.execute(
+        select(StartupHistory).where(StartupHistory.id == item_id, StartupHistory.user_id == current_user.id)
+    )).scalars().first()
+    if not item:
+        raise HTTPException(status_code=404, detail="History item not found")
+
+    stored = load_pack(item.full_json_blob, item.full_json)
+    competitor_matrix = stored.pop("competitor_matrix", [])
+    try:
+        pack = StartupPack.model_validate(stored)
+        result = await regenerate_sections(
+            item.idea, pack, competitor_matrix, list(dict.fromkeys(payload.sections)), payload.instructions
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Regeneration failed: {e}")
+
+    stored_json = dumps(result["startup_pack"])
+    if result["competitor_matrix"]:
+        stored_json = extend_object(stored_json, competitor_matrix=dumps(result["competitor_matrix"]))
+    item.full_json_blob = encode_pack(stored_json)
+    item.full_json = None
+    item.brand_name, item.competitors_text = search_fields(result["startup_pack"], result["competitor_matrix"])
+    await db.commit()
+
+    return {"id": item_id, **result}
@@ -0,0 +1,40 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+
+from database import get_async_db
+from auth_resolver import Principal, get_current_user
+from history_writer import history_writer
+from similarity import find_similar, SIMILAR_MIN_JACCARD
+
+router = APIRouter(prefix="/api/ideas", tags=["ideas"])
+
+class SimilarIdea(BaseModel):
+    id: int
+    idea: str
+    summary: Optional[str] = None
+    created_at: str
+    similarity: float   # Jaccard similarity of the words in the two ideas, 0-1
+
+class SimilarIdeasResponse(BaseModel):
+    items: List[SimilarIdea]
+
+@router.get("/similar", response_model=SimilarIdeasResponse)
+async def similar_ideas(
+    q: str = Query(..., min_length=1, max_length=2000),
+    limit: int = Query(10, ge=1, le=50),
+    min_similarity: float = Query(SIMILAR_MIN_JACCARD, ge=0.0, le=1.0),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """The caller's saved ideas most similar to `q`, e.g. to flag a near-duplicate before generating."""
+    await history_writer.wait_for_user(current_user.id)
+    matches = await find_similar(db, current_user.id, q, limit, min_similarity)
+    return SimilarIdeasResponse(items=[
+        SimilarIdea(
+            id=row.id, idea=row.idea, summary=row.summary, created_at=str(row.created_at),
+            similarity=round(score, 4),
+        )
+        for row, score in matches
+    ])
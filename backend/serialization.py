@@ -0,0 +1,44 @@
+import json
+from typing import Any
+
+from starlette.responses import Response
+
+# orjson is optional; the stdlib fallback produces the same compact output
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+# ==============================================================
+# Fast JSON
+# ==============================================================
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def splice_object(**fields: bytes) -> bytes:
+    """JSON object from already-serialized field values, without re-encoding them."""
+    return b"{" + b",".join(dumps(k) + b":" + v for k, v in fields.items()) + b"}"
+
+def extend_object(obj: bytes, **fields: bytes) -> bytes:
+    """Appends already-serialized fields to a serialized, non-empty JSON object."""
+    return obj[:-1] + b"".join(b"," + dumps(k) + b":" + v for k, v in fields.items()) + b"}"
+
+class FastJSONResponse(Response):
+    """JSON response that sends pre-serialized bytes as-is and uses the fast encoder otherwise."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return bytes(content)
+        return dumps(content)
@@ -0,0 +1,218 @@
+import os
+import re
+import zlib
+import functools
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select, insert, delete, text, bindparam
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import IdeaBucket, StartupHistory
+
+# ==============================================================
+# Config
+# ==============================================================
+# Changing the signature layout changes every bucket key: run
+# `python similarity.py --rebuild` afterwards.
+
+SIMILAR_NUM_PERM = int(os.getenv("SIMILAR_NUM_PERM", "64"))
+SIMILAR_BANDS = int(os.getenv("SIMILAR_BANDS", "16"))  # rows per band = NUM_PERM / BANDS
+SIMILAR_MIN_JACCARD = float(os.getenv("SIMILAR_MIN_JACCARD", "0.2"))
+SIMILAR_MAX_CANDIDATES = int(os.getenv("SIMILAR_MAX_CANDIDATES", "200"))
+SIMILAR_REBUILD_BATCH = 2000
+
+if SIMILAR_NUM_PERM % SIMILAR_BANDS:
+    raise ValueError("SIMILAR_NUM_PERM must be a multiple of SIMILAR_BANDS.")
+_ROWS = SIMILAR_NUM_PERM // SIMILAR_BANDS
+
+# Common words carry no signal about what an idea is
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or our that the their this to
+we will with your you app platform startup business users user customers service services based
+""".split())
+
+# ==============================================================
+# MinHash Signatures
+# ==============================================================
+
+# Fixed seed: signatures are persisted, so the hash family must never change between runs
+_rng = np.random.default_rng(0x5EED)
+_A = _rng.integers(1, 2 ** 63, SIMILAR_NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, SIMILAR_NUM_PERM, dtype=np.uint64)
+_BAND_MULT = _rng.integers(1, 2 ** 63, _ROWS, dtype=np.uint64) | np.uint64(1)
+_BAND_SALT = _rng.integers(0, 2 ** 63, SIMILAR_BANDS, dtype=np.uint64)
+_USER_MULT = np.uint64(0x9E3779B97F4A7C15)
+_EMPTY = np.uint64(2 ** 32)
+
+def shingles(value: str) -> Set[str]:
+    """Distinct lowercase words, minus stopwords and single characters."""
+    return {w for w in re.findall(r"[a-z0-9]+", value.lower()) if len(w) > 1 and w not in STOPWORDS}
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+@functools.lru_cache(maxsize=1 << 18)
+def _word_hash(word: str) -> int:
+    return zlib.crc32(word.encode())
+
+def signatures(token_sets: Sequence[Set[str]]) -> np.ndarray:
+    """
+    MinHash signatures, shape (n, SIMILAR_NUM_PERM). Each permutation is a
+    multiply-shift hash of the word's CRC32; the whole batch is hashed in one
+    array and reduced per item. Items without words get an all-empty row.
+    """
+    lengths = np.fromiter((len(t) for t in token_sets), dtype=np.int64, count=len(token_sets))
+    sig = np.full((len(token_sets), SIMILAR_NUM_PERM), _EMPTY, dtype=np.uint64)
+    if not lengths.any():
+        return sig
+    flat = [w for tokens in token_sets for w in tokens]
+    words = np.fromiter(map(_word_hash, flat), dtype=np.uint64, count=len(flat))
+    # uint64 arithmetic wraps, which is what multiply-shift hashing relies on.
+    # Laid out (perm, word) so each item's reduction runs over contiguous memory.
+    hashed = (_A[:, None] * words + _B[:, None]) >> np.uint64(32)
+    nonempty = lengths > 0
+    starts = (np.cumsum(lengths) - lengths)[nonempty]
+    sig[nonempty] = np.minimum.reduceat(hashed, starts, axis=1).T
+    return sig
+
+def bucket_keys(user_ids: np.ndarray, sig: np.ndarray) -> np.ndarray:
+    """
+    One LSH bucket key per band, shape (n, SIMILAR_BANDS), as signed 64-bit
+    ints for SQLite. The owner is mixed in, so every user has their own buckets.
+    """
+    bands = sig.reshape(len(sig), SIMILAR_BANDS, _ROWS)
+    x = (bands * _BAND_MULT).sum(axis=2, dtype=np.uint64) + _BAND_SALT
+    x += user_ids.astype(np.uint64)[:, None] * _USER_MULT
+    # splitmix64 finalizer so nearby inputs land far apart
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return x.view(np.int64)
+
+def bucket_pairs(items: Iterable[Tuple[int, int, Optional[str]]]) -> List[Tuple[int, int]]:
+    """
+    (bucket, history_id) for (history_id, user_id, idea) items; items without
+    words are not indexed. Only the idea is signed: lookups are by idea text,
+    and a generated summary would swamp its words.
+    """
+    items = list(items)
+    token_sets = [shingles(idea or "") for _, _, idea in items]
+    keep = [i for i, tokens in enumerate(token_sets) if tokens]
+    if not keep:
+        return []
+    keys = bucket_keys(
+        np.array([items[i][1] for i in keep]), signatures([token_sets[i] for i in keep])
+    ).tolist()
+    return [(key, items[i][0]) for i, row in zip(keep, keys) for key in row]
+
+def bucket_rows(items: Iterable[Tuple[int, int, Optional[str]]]) -> List[Dict[str, int]]:
+    """bucket_pairs() as parameter dicts for INSERT_BUCKETS."""
+    return [{"bucket": bucket, "history_id": history_id} for bucket, history_id in bucket_pairs(items)]
+
+# ==============================================================
+# Index Maintenance
+# ==============================================================
+# Buckets are only ever added. A bucket left behind by a deleted row is a
+# false candidate at worst: lookups re-score candidates against the
+# current rows. rebuild_index() drops such leftovers.
+
+INSERT_BUCKETS = insert(IdeaBucket).prefix_with("OR IGNORE")
+
+def rebuild_index(db: Session, batch_size: int = SIMILAR_REBUILD_BATCH) -> int:
+    """
+    Recomputes idea_lsh from startup_history. Rows go to an unindexed
+    staging table first and are copied over in key order, so the index
+    b-tree is appended to instead of updated at random.
+    """
+    db.execute(text("DROP TABLE IF EXISTS idea_lsh_staging"))
+    db.execute(text("CREATE TEMP TABLE idea_lsh_staging (bucket INTEGER, history_id INTEGER)"))
+    last_id, indexed = 0, 0
+    while True:
+        rows = db.execute(
+            select(StartupHistory.id, StartupHistory.user_id, StartupHistory.idea)
+            .where(StartupHistory.id > last_id)
+            .order_by(StartupHistory.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        pairs = bucket_pairs(rows)
+        if pairs:
+            # Driver-level executemany: millions of rows, no per-row parameter processing
+            db.connection().exec_driver_sql("INSERT INTO idea_lsh_staging VALUES (?, ?)", pairs)
+        last_id = rows[-1].id
+        indexed += len(rows)
+
+    db.execute(delete(IdeaBucket))
+    db.execute(text(
+        "INSERT OR IGNORE INTO idea_lsh (bucket, history_id) "
+        "SELECT bucket, history_id FROM idea_lsh_staging ORDER BY bucket, history_id"
+    ))
+    db.execute(text("DROP TABLE idea_lsh_staging"))
+    db.commit()
+    return indexed
+
+# ==============================================================
+# Lookup
+# ==============================================================
+
+_CANDIDATES_SQL = text("""
+    SELECT history_id, count(*) AS bands FROM idea_lsh
+    WHERE bucket IN :buckets
+    GROUP BY history_id ORDER BY bands DESC LIMIT :limit
+""").bindparams(bindparam("buckets", expanding=True))
+
+# Unary + keeps SQLite on primary-key lookups; otherwise it may walk the
+# user's whole (user_id, created_at) index range to apply the owner filter
+_ROWS_SQL = text("""
+    SELECT id, idea, summary, created_at FROM startup_history
+    WHERE id IN :ids AND +user_id = :user_id
+""").bindparams(bindparam("ids", expanding=True))
+
+async def find_similar(
+    db: AsyncSession,
+    user_id: int,
+    value: str,
+    limit: int = 10,
+    min_similarity: float = SIMILAR_MIN_JACCARD,
+) -> List[Tuple[Any, float]]:
+    """
+    (row, similarity) for this user's history items most similar to `value`,
+    best first. The LSH buckets shortlist candidates with index lookups; each
+    candidate is then scored by the exact Jaccard similarity of its idea's words.
+    """
+    tokens = shingles(value)
+    if not tokens:
+        return []
+    keys = bucket_keys(np.array([user_id]), signatures([tokens]))[0].tolist()
+    candidates = (await db.execute(
+        _CANDIDATES_SQL, {"buckets": keys, "limit": SIMILAR_MAX_CANDIDATES}
+    )).scalars().all()
+    if not candidates:
+        return []
+    rows = (await db.execute(_ROWS_SQL, {"ids": candidates, "user_id": user_id})).all()
+
+    scored = [(row, jaccard(tokens, shingles(row.idea or ""))) for row in rows]
+    scored = [(row, score) for row, score in scored if score >= min_similarity]
+    scored.sort(key=lambda pair: (-pair[1], -pair[0].id))
+    return scored[:limit]
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Maintain the similar-ideas (MinHash/LSH) index.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute idea_lsh from startup_history")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+    else:
+        start = time.perf_counter()
+        with SessionLocal() as db:
+            indexed = rebuild_index(db)
+        print(f"[SIMILAR] Indexed {indexed} history items in {time.perf_counter() - start:.1f}s.")
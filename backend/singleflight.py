@@ -0,0 +1,74 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+# ==============================================================
+# Single-Flight Request Coalescing
+# ==============================================================
+
+class SharedStream:
+    """
+    Runs one async iterator in a background task and lets any number of
+    subscribers read its items. Late subscribers replay from the start.
+    The task is not cancelled when subscribers go away, so the shared work
+    always finishes (and can populate caches).
+    """
+
+    def __init__(self, source: AsyncIterator[Any]):
+        self._items: List[Any] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._cond = asyncio.Condition()
+        self.task = asyncio.create_task(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[Any]) -> None:
+        try:
+            async for item in source:
+                async with self._cond:
+                    self._items.append(item)
+                    self._cond.notify_all()
+        except Exception as e:
+            self._error = e
+        finally:
+            async with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        i = 0
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: i < len(self._items) or self._done)
+                batch = self._items[i:]
+                done = self._done
+            for item in batch:
+                yield item
+            i += len(batch)
+            if done and i >= len(self._items):
+                if self._error is not None:
+                    raise self._error
+                return
+
+class SingleFlight:
+    """Concurrent callers with the same key share one in-flight run."""
+
+    def __init__(self):
+        self._inflight: Dict[str, SharedStream] = {}
+        self.stats = {"leaders": 0, "deduplicated": 0}
+
+    def stream(self, key: str, factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        shared = self._inflight.get(key)
+        if shared is None:
+            shared = SharedStream(factory())
+            self._inflight[key] = shared
+            shared.task.add_done_callback(lambda _: self._forget(key, shared))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["deduplicated"] += 1
+        return shared.subscribe()
+
+    def _forget(self, key: str, shared: SharedStream) -> None:
+        if self._inflight.get(key) is shared:
+            del self._inflight[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "in_flight": len(self._inflight)}
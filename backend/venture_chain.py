@@ -1,18 +1,26 @@
 import os
-import base64
 import asyncio
-from typing import List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple, Type, TypeVar
 
-import requests
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, create_model
 from langchain_openai import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage
+from langchain.schema import BaseMessage, SystemMessage, HumanMessage
+
+from pipeline import Stage, run_graph, stage_state
+from clients import clients, STABILITY_ENDPOINT
+from asset_store import save_logo, logo_url
+from rate_limits import rate_limiter, estimate_tokens
+from metrics import track_stage, record_llm_usage, record_image_generated, STAGES_OMITTED
+from hedging import hedged
+from financials import FinancialDrivers, headline_figures
+from domains import domain_engine, domain_candidates
 
 # Load .env
 load_dotenv()
 
+T = TypeVar("T", bound=BaseModel)
+
 # ==============================================================
 # Pydantic Models
 # ==============================================================
@@ -33,6 +41,8 @@ class Financials(BaseModel):
     burn_rate: str
     break_even_month: str
     runway: str
+    # When present, the six figures above are recomputed from these (see financials.py)
+    drivers: Optional[FinancialDrivers] = None
 
 class PitchSlides(BaseModel):
     problem: str
@@ -78,107 +88,122 @@ class CompetitorRow(BaseModel):
 class CompetitorMatrixPack(BaseModel):
     rows: List[CompetitorRow]
 
+class CompactPack(StartupPack):
+    """StartupPack plus the auxiliary sections, generated in one structured call (compact mode)."""
+    real_world_scenario: RealWorldScenario
+    competitor_matrix: List[CompetitorRow]
+
 # ==============================================================
 # LLM Setup
 # ==============================================================
 
-from langchain_openai import ChatOpenAI
-
 def _get_llm() -> ChatOpenAI:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY missing in .env")
-    return ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.7,
-        openai_api_key=api_key
-    )
+    # Shared instance from the client registry (pooled keep-alive HTTP client)
+    return clients.get_llm()
+
+async def _ainvoke_structured(schema: Type[T], messages: List[BaseMessage], stage: str, hedge: bool = False) -> T:
+    """
+    Structured-output call that respects the OpenAI RPM/TPM budget and records token usage.
+    With hedge=True a duplicate request is fired if the call outlives the stage's observed p95.
+    """
+    async def attempt() -> T:
+        limiter = rate_limiter("openai")
+        estimated = estimate_tokens("".join(str(m.content) for m in messages))
+        await limiter.acquire(estimated)
+
+        structured = _get_llm().with_structured_output(schema, include_raw=True)
+        out = await structured.ainvoke(messages)
+        usage = getattr(out["raw"], "usage_metadata", None) or {}
+        limiter.settle(estimated, usage.get("total_tokens"))
+        record_llm_usage(stage, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+        if out.get("parsing_error") is not None:
+            raise out["parsing_error"]
+        return out["parsed"]
+
+    if hedge:
+        return await hedged(stage, attempt)
+    return await attempt()
 
 # ==============================================================
-# Stability AI Logo (Sync -> Async Wrapper)
+# Stability AI Logo (Async)
 # ==============================================================
 
-def _generate_logo_sync(brand_name: str, logo_prompt: str, colors: List[str], tone: str) -> Optional[str]:
-    """Synchronous call to Stability AI."""
+async def generate_logo_async(brand_name: str, logo_prompt: str, colors: List[str], tone: str) -> Optional[str]:
+    """Call Stability AI over the pooled async HTTP client."""
     stability_key = os.getenv("STABILITY_API_KEY")
     if not stability_key:
         print("[LOGO] STABILITY_API_KEY not set → skipping.")
         return None
 
     try:
-        endpoint = "https://api.stability.ai/v2beta/stable-image/generate/core"
-        prompt = (
-            f"{logo_prompt}. Brand name: {brand_name}. "
-            f"Tone: {tone}. Colors: {', '.join(colors)}. "
-            "Style: modern, minimalist, premium, vector logo, highly detailed, centered, white background."
-        )
-        print(f"[LOGO] Calling Stability for: {brand_name}")
-        
-        headers = {
-            "Authorization": f"Bearer {stability_key}",
-            "Accept": "image/*",
-        }
-        files = {
-            "prompt": (None, prompt),
-            "output_format": (None, "png"),
-        }
-        resp = requests.post(endpoint, headers=headers, files=files)
-        
-        if resp.status_code != 200:
-            print("[LOGO] Stability API error:", resp.text[:200])
-            return None
-
-        image_base64 = base64.b64encode(resp.content).decode("utf-8")
-        return f"data:image/png;base64,{image_base64}"
+        with track_stage("logo"):
+            prompt = (
+                f"{logo_prompt}. Brand name: {brand_name}. "
+                f"Tone: {tone}. Colors: {', '.join(colors)}. "
+                "Style: modern, minimalist, premium, vector logo, highly detailed, centered, white background."
+            )
+            print(f"[LOGO] Calling Stability for: {brand_name}")
+
+            headers = {
+                "Authorization": f"Bearer {stability_key}",
+                "Accept": "image/*",
+            }
+            files = {
+                "prompt": (None, prompt),
+                "output_format": (None, "png"),
+            }
+            await rate_limiter("stability").acquire()
+            resp = await clients.stability_http().post(STABILITY_ENDPOINT, headers=headers, files=files)
+
+            if resp.status_code != 200:
+                print("[LOGO] Stability API error:", resp.text[:200])
+                resp.raise_for_status()
+            record_image_generated("logo")
+
+            # Stored once by content hash; the pack only carries the reference
+            digest = await asyncio.to_thread(save_logo, resp.content)
+        return logo_url(digest)
     except Exception as e:
         print("[LOGO] Exception:", e)
         return None
 
-async def generate_logo_async(brand_name: str, logo_prompt: str, colors: List[str], tone: str) -> Optional[str]:
-    """Run sync blocking requests in a thread."""
-    loop = asyncio.get_running_loop()
-    with ThreadPoolExecutor() as pool:
-        return await loop.run_in_executor(
-            pool, _generate_logo_sync, brand_name, logo_prompt, colors, tone
-        )
-
 # ==============================================================
 # Helper Async Tasks
 # ==============================================================
 
 async def get_real_world_scenario_async(idea: str) -> Optional[RealWorldScenario]:
     try:
-        llm = _get_llm()
-        structured = llm.with_structured_output(RealWorldScenario)
-        prompt = f"""
-        Idea: {idea}
-        Generate a vivid, consumer-centric real-world scenario.
-        - User Story: Who is the user?
-        - Pain Point: What sucks for them right now?
-        - Day in Life: How does this product change their day?
-        """
-        print(f"[SCENARIO] Generating for {idea}...")
-        scenario = await structured.ainvoke([HumanMessage(content=prompt)])
+        with track_stage("real_world_scenario"):
+            prompt = f"""
+            Idea: {idea}
+            Generate a vivid, consumer-centric real-world scenario.
+            - User Story: Who is the user?
+            - Pain Point: What sucks for them right now?
+            - Day in Life: How does this product change their day?
+            """
+            print(f"[SCENARIO] Generating for {idea}...")
+            scenario = await _ainvoke_structured(RealWorldScenario, [HumanMessage(content=prompt)], "real_world_scenario")
         return scenario
     except Exception as e:
         print("[SCENARIO] Error:", e)
         return None
 
-async def get_competitor_matrix_async(idea: str, summary: str) -> List[Dict[str, Any]]:
+async def get_competitor_matrix_async(idea: str, summary: Optional[str]) -> Optional[List[Dict[str, Any]]]:
     try:
-        llm = _get_llm()
-        structured = llm.with_structured_output(CompetitorMatrixPack)
-        prompt = f"""
-        Idea: {idea}
-        Summary: {summary}
-        Generate competitor matrix (3-5 rows).
-        """
-        print("[COMPETITORS] Generating matrix...")
-        pack: CompetitorMatrixPack = await structured.ainvoke([HumanMessage(content=prompt)])
+        with track_stage("competitor_matrix"):
+            # summary is None when started speculatively, before the main pack exists
+            prompt = f"""
+            Idea: {idea}
+            Summary: {summary or idea}
+            Generate competitor matrix (3-5 rows).
+            """
+            print("[COMPETITORS] Generating matrix...")
+            pack = await _ainvoke_structured(CompetitorMatrixPack, [HumanMessage(content=prompt)], "competitor_matrix")
         return pack.model_dump().get("rows", [])
     except Exception as e:
         print("[COMPETITORS] Error:", e)
-        return []
+        return None
 
 # ==============================================================
 # Markdown Builder
@@ -238,60 +263,300 @@ def build_reply_markdown(pack: StartupPack) -> str:
     return "\n".join(lines)
 
 # ==============================================================
-# Main Orchestrator (Async)
+# Pipeline Stages
 # ==============================================================
 
-async def get_venture_response(idea: str) -> Dict[str, Any]:
-    if not idea or not idea.strip():
-        raise ValueError("Startup idea is empty.")
+FINANCIALS_HINT = (
+    "For financials, estimate realistic monthly drivers (price per customer, CAC, churn, headcount, "
+    "growth); the headline figures are computed from them."
+)
 
-    print("[CORE] 1. Generating StartupPack (Main)...")
-    llm = _get_llm()
-    structured = llm.with_structured_output(StartupPack)
-    
+def with_projected_financials(pack: T) -> T:
+    """Replaces the LLM's free-text financial figures with ones computed from its drivers."""
+    f = pack.financials
+    if f.drivers is None:
+        return pack
+    try:
+        figures = headline_figures(f.drivers)
+    except ValueError as e:
+        print("[FINANCIALS] Ignoring invalid drivers:", e)
+        return pack
+    pack.financials = f.model_copy(update=figures)
+    return pack
+
+async def generate_startup_pack_async(idea: str) -> StartupPack:
+    print("[CORE] Generating StartupPack (Main)...")
     messages = [
-        SystemMessage(content="You are VentureMind.AI. Generate a consumer-centric startup pack. Focus on specific user needs. Use clear headings."),
+        SystemMessage(content=(
+            "You are VentureMind.AI. Generate a consumer-centric startup pack. Focus on specific user needs. "
+            "Use clear headings. " + FINANCIALS_HINT
+        )),
         HumanMessage(content=f"User idea: {idea}")
     ]
-    
-    # 1. Main Pack (Must happen first to get brand name/tone)
-    pack: StartupPack = await structured.ainvoke(messages)
-    print("[CORE] Main Pack Generated. Starting Parallel Tasks...")
-
-    # 2. Parallelize Aux Tasks
-    # - Logo (needs brand details)
-    # - Domains (needs brand name)
-    # - Competitors (needs summary)
-    
-    logo_task = generate_logo_async(
-        pack.brand.name,
-        pack.brand.logo_prompt,
-        pack.brand.colors,
-        pack.brand.brand_tone
-    )
-    
-    scenario_task = get_real_world_scenario_async(idea)
-    
-    competitor_task = get_competitor_matrix_async(idea, pack.startup_summary)
+    with track_stage("startup_pack"):
+        # The only stage the response cannot do without, so it is hedged
+        pack = await _ainvoke_structured(StartupPack, messages, "startup_pack", hedge=True)
+    print("[CORE] Main Pack Generated.")
+    return with_projected_financials(pack)
+
+async def generate_compact_pack_async(idea: str) -> CompactPack:
+    print("[CORE] Generating CompactPack (single call)...")
+    messages = [
+        SystemMessage(content=(
+            "You are VentureMind.AI. Generate a consumer-centric startup pack. Focus on specific user needs. "
+            "Use clear headings. Also include a vivid real-world scenario (who the user is, the pain point "
+            "solved, a day in their life) and a competitor matrix of 3-5 rows. " + FINANCIALS_HINT
+        )),
+        HumanMessage(content=f"User idea: {idea}")
+    ]
+    with track_stage("compact_pack"):
+        pack = await _ainvoke_structured(CompactPack, messages, "compact_pack", hedge=True)
+    print("[CORE] Compact Pack Generated.")
+    return with_projected_financials(pack)
 
-    # 3. Wait for all
-    logo_url, scenario_obj, competitor_matrix = await asyncio.gather(
-        logo_task, scenario_task, competitor_task
-    )
+async def _logo_stage(startup_pack: StartupPack) -> Optional[str]:
+    b = startup_pack.brand
+    return await generate_logo_async(b.name, b.logo_prompt, b.colors, b.brand_tone)
 
-    if logo_url:
-        pack.brand.logo_url = logo_url
-    
-    if scenario_obj:
-        pack.real_world_scenario = scenario_obj
+async def _compact_logo_stage(compact_pack: CompactPack) -> Optional[str]:
+    return await _logo_stage(compact_pack)
+
+async def check_domains_async(brand: Brand) -> Optional[List[Dict[str, Any]]]:
+    try:
+        with track_stage("domains"):
+            candidates = domain_candidates([brand.name, brand.alt_name])
+            print(f"[DOMAINS] Checking {len(candidates)} candidates...")
+            results = await domain_engine.check_many(candidates)
+        return [
+            DomainCheckResult(domain=domain, tld="." + domain.split(".", 1)[1], availability=availability, comment=comment).model_dump()
+            for domain, (availability, comment) in results
+        ]
+    except Exception as e:
+        print("[DOMAINS] Error:", e)
+        return None
+
+async def _domain_stage(startup_pack: StartupPack) -> Optional[List[Dict[str, Any]]]:
+    return await check_domains_async(startup_pack.brand)
+
+async def _compact_domain_stage(compact_pack: CompactPack) -> Optional[List[Dict[str, Any]]]:
+    return await check_domains_async(compact_pack.brand)
+
+async def _competitor_stage(idea: str, startup_pack: Optional[StartupPack]) -> Optional[List[Dict[str, Any]]]:
+    summary = startup_pack.startup_summary if startup_pack else None
+    return await get_competitor_matrix_async(idea, summary)
+
+# Each stage starts as soon as its inputs exist:
+# - Scenario only needs the idea, so it runs alongside the main pack
+# - Competitors need the summary (or just the idea, when speculating)
+# - Logo and domains need the brand details
+# Everything except the core pack is optional and is dropped at the deadline.
+VENTURE_STAGES = [
+    Stage("startup_pack", generate_startup_pack_async, requires=("idea",)),
+    Stage("real_world_scenario", get_real_world_scenario_async, requires=("idea",), optional=True),
+    Stage("competitor_matrix", _competitor_stage, requires=("idea", "startup_pack"),
+          speculative_requires=("idea",), optional=True),
+    Stage("logo_url", _logo_stage, requires=("startup_pack",), optional=True),
+    Stage("domains", _domain_stage, requires=("startup_pack",), optional=True),
+]
+
+# Compact mode: one structured call for pack, scenario and competitors; the logo
+# stays a separate Stability call. Fewer round trips and tokens, less parallelism.
+COMPACT_STAGES = [
+    Stage("compact_pack", generate_compact_pack_async, requires=("idea",)),
+    Stage("logo_url", _compact_logo_stage, requires=("compact_pack",), optional=True),
+    Stage("domains", _compact_domain_stage, requires=("compact_pack",), optional=True),
+]
+
+PIPELINE_MODES = {"fanout": VENTURE_STAGES, "compact": COMPACT_STAGES}
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "fanout")
+PIPELINE_SPECULATE = os.getenv("PIPELINE_SPECULATE", "0") == "1"
+# Latency SLO per request; 0 disables the deadline
+PIPELINE_BUDGET_SECONDS = float(os.getenv("PIPELINE_BUDGET_SECONDS", "60"))
+
+# ==============================================================
+# Main Orchestrator (Async, Streaming)
+# ==============================================================
+
+# What list-valued stages stream when they fail, so clients always get a list
+_FAILED_STAGE_VALUES: Dict[str, Any] = {"competitor_matrix": [], "domains": []}
+
+def _split_compact(pack: CompactPack) -> List[Tuple[str, Any]]:
+    """Compact output as the same (stage, value) results fan-out mode produces."""
+    startup_pack = StartupPack.model_validate(pack.model_dump(exclude={"real_world_scenario", "competitor_matrix"}))
+    return [
+        ("startup_pack", startup_pack),
+        ("real_world_scenario", pack.real_world_scenario),
+        ("competitor_matrix", [row.model_dump() for row in pack.competitor_matrix]),
+    ]
+
+async def stream_venture_response(
+    idea: str,
+    speculate: Optional[bool] = None,
+    budget_seconds: Optional[float] = None,
+    mode: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Yields (event, data) pairs as each pipeline stage finishes, in completion
+    order: "startup_pack" (core pack), "real_world_scenario",
+    "competitor_matrix", "logo_url" and "domains", then "done" with the full result.
+    Optional stages that miss the budget are skipped and reported as
+    "omitted" in the done event's stage_status; ones that fail (return
+    None) are "failed" and stream their empty value. Both modes emit the same events.
+    """
+    if not idea or not idea.strip():
+        raise ValueError("Startup idea is empty.")
+    mode = mode or PIPELINE_MODE
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode: {mode}")
+    if speculate is None:
+        speculate = PIPELINE_SPECULATE
+    if budget_seconds is None:
+        budget_seconds = PIPELINE_BUDGET_SECONDS
+
+    values: Dict[str, Any] = {}
+    timings: Dict[str, Dict[str, Any]] = {}
+    status: Dict[str, str] = {}
+
+    async for stage, value in run_graph(
+        PIPELINE_MODES[mode], {"idea": idea}, speculate=speculate, timings=timings,
+        budget_seconds=budget_seconds, status=status,
+    ):
+        results = _split_compact(value) if stage == "compact_pack" else [(stage, value)]
+        for name, result in results:
+            # Sections split out of the compact pack are judged like the fan-out stages
+            status.setdefault(name, stage_state(name != "startup_pack", result))
+            if result is None:
+                result = _FAILED_STAGE_VALUES.get(name)
+            values[name] = result
+            yield name, result.model_dump() if isinstance(result, BaseModel) else result
+
+    for stage, state in status.items():
+        if state == "omitted":
+            STAGES_OMITTED.inc(stage)
+
+    pack: StartupPack = values["startup_pack"]
+    if values.get("logo_url"):
+        pack.brand.logo_url = values["logo_url"]
+    if values.get("real_world_scenario"):
+        pack.real_world_scenario = values["real_world_scenario"]
+
+    print(f"[CORE] All tasks complete. Stage timings: {timings}")
 
-    print("[CORE] All tasks complete. Building response.")
-    
     reply_markdown = build_reply_markdown(pack)
 
-    return {
+    yield "done", {
         "reply_markdown": reply_markdown,
         "startup_pack": pack.model_dump(),
-        "domains": [], # Removed
+        "domains": values.get("domains", []),
+        "competitor_matrix": values.get("competitor_matrix", []),
+        "stage_timings": timings,
+        "stage_status": status,
+        "mode": mode,
+    }
+
+async def get_venture_response(idea: str, mode: Optional[str] = None) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    async for event, data in stream_venture_response(idea, mode=mode):
+        if event == "done":
+            result = data
+    return result
+
+# ==============================================================
+# Section Regeneration (reuses a stored pack)
+# ==============================================================
+
+# Sections the main pack call produces; any mix of them is redone in one call
+PACK_SECTIONS: Dict[str, Type[BaseModel]] = {"brand": Brand, "financials": Financials, "pitch": Pitch}
+REGENERABLE_SECTIONS = ("brand", "logo", "financials", "pitch", "real_world_scenario", "competitor_matrix")
+
+async def regenerate_pack_sections(
+    idea: str, startup_pack: StartupPack, sections: List[str], instructions: Optional[str] = None
+) -> BaseModel:
+    """One structured call returning only `sections`, with the rest of the pack as context."""
+    schema = create_model("PackSections", **{s: (PACK_SECTIONS[s], ...) for s in sections})
+    context = startup_pack.model_dump_json(exclude={*sections, "real_world_scenario"})
+    print(f"[REGENERATE] Regenerating {sections}...")
+    messages = [
+        SystemMessage(content=(
+            "You are VentureMind.AI. Rewrite only the requested sections of an existing startup pack. "
+            "Keep them consistent with the rest of the pack, which must not change."
+            + (" " + FINANCIALS_HINT if "financials" in sections else "")
+        )),
+        HumanMessage(content=(
+            f"User idea: {idea}\nCurrent pack: {context}\nSections to rewrite: {', '.join(sections)}"
+            + (f"\nUser instructions: {instructions}" if instructions else "")
+        )),
+    ]
+    with track_stage("regenerate"):
+        return await _ainvoke_structured(schema, messages, "regenerate")
+
+async def regenerate_sections(
+    idea: str,
+    startup_pack: StartupPack,
+    competitor_matrix: List[Dict[str, Any]],
+    sections: List[str],
+    instructions: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Re-runs only the stages behind `sections` against a stored pack and
+    returns the patched result in the same shape as the pipeline's "done"
+    payload. A new brand also gets a new logo. Auxiliary stages that fail
+    keep their previous value and are reported as "failed" in stage_status.
+    """
+    unknown = set(sections) - set(REGENERABLE_SECTIONS)
+    if not sections or unknown:
+        raise ValueError(f"Sections must be a non-empty subset of {list(REGENERABLE_SECTIONS)}.")
+
+    pack_sections = [s for s in PACK_SECTIONS if s in sections]
+    stages: List[Stage] = []
+    if pack_sections:
+        stages.append(Stage(
+            "pack_sections",
+            lambda idea, startup_pack: regenerate_pack_sections(idea, startup_pack, pack_sections, instructions),
+            requires=("idea", "startup_pack"),
+        ))
+    if "real_world_scenario" in sections:
+        stages.append(Stage("real_world_scenario", get_real_world_scenario_async, requires=("idea",)))
+    if "competitor_matrix" in sections:
+        stages.append(Stage("competitor_matrix", _competitor_stage, requires=("idea", "startup_pack")))
+    if "brand" in sections:
+        # The logo depends on the brand, so it waits for the new one
+        stages.append(Stage(
+            "logo_url", lambda pack_sections: _logo_stage(startup_pack.model_copy(update={"brand": pack_sections.brand})),
+            requires=("pack_sections",),
+        ))
+    elif "logo" in sections:
+        stages.append(Stage("logo_url", _logo_stage, requires=("startup_pack",)))
+
+    values: Dict[str, Any] = {}
+    async for stage, value in run_graph(stages, {"idea": idea, "startup_pack": startup_pack}):
+        values[stage] = value
+
+    status: Dict[str, str] = {}
+    pack = startup_pack.model_copy(deep=True)
+    if pack_sections:
+        pack = pack.model_copy(update={s: getattr(values["pack_sections"], s) for s in pack_sections})
+        if "financials" in pack_sections:
+            pack = with_projected_financials(pack)
+        status.update({s: "ok" for s in pack_sections})
+    if "logo_url" in values:
+        ok = values["logo_url"] is not None
+        if ok or "brand" in sections:
+            # A failed logo for a new brand is dropped rather than showing the old brand's logo
+            pack.brand.logo_url = values["logo_url"]
+        status["logo"] = "ok" if ok else "failed"
+    if "real_world_scenario" in values:
+        if values["real_world_scenario"] is not None:
+            pack.real_world_scenario = values["real_world_scenario"]
+        status["real_world_scenario"] = "ok" if values["real_world_scenario"] is not None else "failed"
+    if "competitor_matrix" in values:
+        if values["competitor_matrix"] is not None:
+            competitor_matrix = values["competitor_matrix"]
+        status["competitor_matrix"] = "ok" if values["competitor_matrix"] is not None else "failed"
+
+    return {
+        "reply_markdown": build_reply_markdown(pack),
+        "startup_pack": pack.model_dump(),
         "competitor_matrix": competitor_matrix,
+        "stage_status": status,
     }
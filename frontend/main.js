@@ -1,4 +1,6 @@
+const API_ORIGIN = "http://127.0.0.1:8000";
 const API_URL = "http://127.0.0.1:8000/api/chat";
+const STREAM_URL = "http://127.0.0.1:8000/api/chat/stream";
 const AUTH_URL = "http://127.0.0.1:8000/auth";
 const HISTORY_URL = "http://127.0.0.1:8000/history";
 
@@ -303,22 +305,27 @@ if (historyCloseBtn) {
 
 // historyCloseBtn removed from markup, no listener needed
 
-async function fetchHistory() {
+async function fetchHistory(cursor = null) {
   if (!authToken) return;
   try {
-    const res = await fetch(HISTORY_URL + "/", {
+    const params = new URLSearchParams({ limit: "50" });
+    if (cursor) params.set("cursor", cursor);
+    const res = await fetch(`${HISTORY_URL}/?${params}`, {
       headers: { "Authorization": `Bearer ${authToken}` }
     });
     if (!res.ok) return;
-    const items = await res.json();
-    renderHistoryList(items);
+    const page = await res.json();
+    renderHistoryList(page.items, page.next_cursor, Boolean(cursor));
   } catch (err) {
     console.error(err);
   }
 }
 
-function renderHistoryList(items) {
-  historyList.innerHTML = "";
+function renderHistoryList(items, nextCursor, append) {
+  if (!append) historyList.innerHTML = "";
+  const oldMore = historyList.querySelector(".history-more");
+  if (oldMore) oldMore.remove();
+
   items.forEach(item => {
     const li = document.createElement("li");
     li.classList.add("history-item");
@@ -330,6 +337,14 @@ function renderHistoryList(items) {
     li.addEventListener("click", () => loadHistoryItem(item.id));
     historyList.appendChild(li);
   });
+
+  if (nextCursor) {
+    const more = document.createElement("li");
+    more.classList.add("history-item", "history-more");
+    more.textContent = "Load more…";
+    more.addEventListener("click", () => fetchHistory(nextCursor));
+    historyList.appendChild(more);
+  }
 }
 
 async function loadHistoryItem(id) {
@@ -402,7 +417,7 @@ chatForm.addEventListener("submit", async (e) => {
   setTyping(true, true);
 
   try {
-    const res = await fetch(API_URL, {
+    const res = await fetch(STREAM_URL, {
       method: "POST",
       headers: headers,
       body: JSON.stringify({ message: text }),
@@ -414,15 +429,30 @@ chatForm.addEventListener("submit", async (e) => {
       return;
     }
 
-    const data = await res.json();
-    const html = renderMarkdown(data.reply_markdown || "");
-    appendMessage({ html, from: "ai" });
-    updateStartupPack(data);
-
-    if (voiceEnabled) {
-      const plain = data.reply_markdown.replace(/[#*]/g, "");
-      speakText(plain);
-    }
+    // Render each pipeline stage as soon as its event arrives
+    let partial = {};
+    await readEventStream(res, (event, data) => {
+      if (event === "startup_pack") {
+        partial = { startup_pack: data };
+        updateStartupPack(partial);
+      } else if (event === "logo_url") {
+        if (data && partial.startup_pack) {
+          partial.startup_pack.brand.logo_url = data;
+          updateStartupPack(partial);
+        }
+      } else if (event === "done") {
+        const html = renderMarkdown(data.reply_markdown || "");
+        appendMessage({ html, from: "ai" });
+        updateStartupPack(data);
+
+        if (voiceEnabled) {
+          const plain = data.reply_markdown.replace(/[#*]/g, "");
+          speakText(plain);
+        }
+      } else if (event === "error") {
+        appendMessage({ text: data.detail || "Error", from: "ai" });
+      }
+    });
 
   } catch (err) {
     console.error(err);
@@ -432,6 +462,32 @@ chatForm.addEventListener("submit", async (e) => {
   }
 });
 
+async function readEventStream(res, onEvent) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+
+      let event = "message";
+      let data = "";
+      frame.split("\n").forEach(line => {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      });
+      onEvent(event, data ? JSON.parse(data) : null);
+    }
+  }
+}
+
 
 // --- Reusing Helper Functions (Markdown, UI Updates) ---
 
@@ -520,7 +576,9 @@ function updateStartupPack(data) {
     });
 
     if (pack.brand.logo_url) {
-      brandLogoImg.src = pack.brand.logo_url;
+      // Logos are served from the backend asset store (/assets/logos/{hash})
+      const logoUrl = pack.brand.logo_url;
+      brandLogoImg.src = logoUrl.startsWith("/") ? API_ORIGIN + logoUrl : logoUrl;
       brandLogoImg.classList.remove("hidden");
       logoPlaceholder.classList.add("hidden");
       logoDownloadBtn.classList.remove("hidden");